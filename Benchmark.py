@@ -0,0 +1,405 @@
+#-----------------------------------------------------------------------------
+# Name:        Benchmark (Benchmark.py)
+# Purpose:     This file measures the performance of GeoApp without opening a
+#              window. Run it with "python Benchmark.py" and compare the numbers
+#              before and after a change.
+#
+# Author:      Nicole J
+# Created:     17-Oct-2026
+# Updated:     17-Oct-2026
+#-----------------------------------------------------------------------------
+
+import os
+import tempfile
+import time
+import tracemalloc
+from array import array
+from Geometry import RegPolygon, IrregPolygon
+from Storage import iterBinaryRecords, iterChunks, iterTextRecords, openBinary, writeBinary
+from Microbit import Microbit, MicrobitGroup, SampleDecoder, encodeFrame
+from MicrobitSimulator import MicrobitSimulator, syntheticTrace
+
+
+def shapeMemory(makeShape, numOfShape=10000):
+    '''
+    This function measures the average memory used by one shape
+
+    Parameters
+    ----------
+    makeShape: function
+        a function that creates one shape
+    numOfShape: integer
+        the number of shapes created for the measurement
+
+    Returns
+    -------
+    float
+        the number of bytes allocated per shape
+    '''
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    shapes = [makeShape() for i in range(numOfShape)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding the shapes is counted too, it is one pointer per shape
+    return (after - before)/len(shapes)
+
+
+def makeRegShape():
+    '''
+    This function creates a regular shape for the memory benchmark
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    RegPolygon
+        a hexagon with side length 5
+    '''
+    return RegPolygon(6, 5.0)
+
+
+def makeIrregShape(numOfSide=20):
+    '''
+    This function creates a closed irregular shape for the memory benchmark
+
+    Parameters
+    ----------
+    numOfSide: integer
+        the number of sides of the shape
+
+    Returns
+    -------
+    IrregPolygon
+        a shape walking around a regular polygon
+    '''
+    shape = IrregPolygon()
+    for i in range(numOfSide - 1):
+        shape.addSide(5.0, i*360/numOfSide)
+    shape.close()
+    return shape
+
+
+def loaderMemory(numOfShape=5000, numOfSide=50):
+    '''
+    This function measures the peak memory used to stream a text save file without keeping the shapes
+
+    Parameters
+    ----------
+    numOfShape: integer
+        the number of irregular shapes in the file
+    numOfSide: integer
+        the number of sides of every shape
+
+    Returns
+    -------
+    fileSize: integer
+        the size of the save file in bytes
+    peak: integer
+        the peak number of bytes allocated while reading
+    '''
+    points = [[250.0 + i, 275.0 - i] for i in range(numOfSide)]
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+        file.write('[]\n')
+        for i in range(numOfShape + 1):
+            file.write(f'{points}\n')
+        file.write('\n')
+    tracemalloc.start()
+    for chunk in iterChunks(iterTextRecords(file.name)):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    fileSize = os.path.getsize(file.name)
+    os.remove(file.name)
+    return fileSize, peak
+
+
+def binaryOpenTime(numOfShape=1000, numOfPoint=1000):
+    '''
+    This function measures the time to open a binary save file and create every shape from it
+
+    Parameters
+    ----------
+    numOfShape: integer
+        the number of irregular shapes in the file
+    numOfPoint: integer
+        the number of points of every shape
+
+    Returns
+    -------
+    float
+        the time in milliseconds
+    '''
+    shape = IrregPolygon()
+    shape.setCoords(array('d', range(numOfPoint*2)), 0.0, 0.0)
+    fileName = os.path.join(tempfile.gettempdir(), 'benchmark.bin')
+    writeBinary([], [shape]*numOfShape, fileName=fileName)
+    start = time.perf_counter()
+    mappedFile = openBinary(fileName)
+    shapes = []
+    for record in iterBinaryRecords(mappedFile):
+        shape = IrregPolygon()
+        shape.setCoords(record[1], record[2], record[3])
+        shapes.append(shape)
+    elapsed = time.perf_counter() - start
+    shapes = shape = record = None # release the views before closing the file
+    mappedFile.close()
+    os.remove(fileName)
+    return elapsed*1000
+
+
+def decodeTime(numOfSample=100000):
+    '''
+    This function measures the time to decode microbit samples sent as text lines and as binary frames
+
+    Parameters
+    ----------
+    numOfSample: integer
+        the number of samples decoded
+
+    Returns
+    -------
+    textTime: float
+        the time in microseconds per text sample
+    binaryTime: float
+        the time in microseconds per binary sample
+    textSize: float
+        the number of bytes per text sample
+    binarySize: float
+        the number of bytes per binary sample
+    '''
+    trace = syntheticTrace(numOfSample)
+    text = b''.join(f'{x} {y}\r\n'.encode() for x, y in trace)
+    binary = b''.join(encodeFrame(i, x, y) for i, (x, y) in enumerate(trace))
+    times = []
+    for data in (text, binary):
+        decoder = SampleDecoder()
+        start = time.perf_counter()
+        for i in range(0, len(data), 4096): # the reader gets the bytes in blocks
+            decoder.feed(data[i:i+4096], 0)
+        times.append((time.perf_counter() - start)/numOfSample*10**6)
+    return times[0], times[1], len(text)/numOfSample, len(binary)/numOfSample
+
+
+def strokeChunking(numOfSample=2000, rate=20000):
+    '''
+    This function checks that a microbit line does not depend on how the samples are split into reads,
+    by drawing the same binary frames read all at once and read one at a time
+
+    Parameters
+    ----------
+    numOfSample: integer
+        the number of samples drawn
+    rate: float
+        the number of samples per second
+
+    Returns
+    -------
+    float
+        the distance in pixels between the ends of the two lines
+    '''
+    from GeoApp import HandDraw
+    frames = [encodeFrame(i, x, y) for i, (x, y) in enumerate(syntheticTrace(numOfSample))]
+    ends = []
+    for reads in ([b''.join(frames)], frames):
+        decoder = SampleDecoder()
+        handDraw = HandDraw()
+        handDraw.drawing = True
+        period = numOfSample/rate/len(reads) # the time between two reads
+        decoder.feed(b'', 0) # the time the reader started
+        for i, data in enumerate(reads):
+            handDraw.microDraw(decoder.feed(data, (i + 1)*period))
+        ends.append(handDraw.microPrevPos)
+    return ((ends[0][0] - ends[1][0])**2 + (ends[0][1] - ends[1][1])**2)**0.5
+
+
+def microbitThroughput(rate=20000, seconds=2, frameRate=100, protocol='auto'):
+    '''
+    This function replays a synthetic trace through the microbit simulator and the background reader,
+    draining the samples once per frame into the microbit drawing like the program does
+
+    Parameters
+    ----------
+    rate: float
+        the number of samples per second sent by the simulator
+    seconds: float
+        the length of the replay
+    frameRate: integer
+        the number of times per second the samples are drained
+    protocol: String
+        the protocol of the simulator, see MicrobitSimulator.start
+
+    Returns
+    -------
+    numOfSent: integer
+        the number of samples sent
+    numOfReceived: integer
+        the number of samples drained from the reader
+    dropped: integer
+        the number of samples overwritten in the ring buffer before they were drained
+    drawTime: float
+        the average time in milliseconds to draw the samples of one frame
+    '''
+    from GeoApp import HandDraw
+    simulator = MicrobitSimulator()
+    os.environ['MICROBIT_DEVICE'] = simulator.device
+    mb = Microbit()
+    del os.environ['MICROBIT_DEVICE']
+    mb.startReader()
+    handDraw = HandDraw()
+    handDraw.drawing = True
+    simulator.start(syntheticTrace(int(rate*seconds)), rate, protocol=protocol)
+    numOfReceived = 0
+    drawTime = 0
+    numOfFrame = 0
+    while simulator.isRunning() or mb.samples:
+        time.sleep(1/frameRate)
+        samples = mb.readSamples()
+        start = time.perf_counter()
+        handDraw.microDraw(samples)
+        drawTime += time.perf_counter() - start
+        numOfReceived += len(samples)
+        numOfFrame += 1
+    time.sleep(0.1) # let the reader finish the last lines
+    numOfReceived += len(mb.readSamples())
+    mb.closeConnection()
+    simulator.close()
+    return simulator.numOfSent, numOfReceived, mb.droppedSamples, drawTime/numOfFrame*1000
+
+
+def groupThroughput(numOfDevice=8, rate=5000, seconds=2, frameRate=100):
+    '''
+    This function replays a synthetic trace on several microbit simulators at once, read by a microbit group,
+    draining the merged samples once per frame into one microbit drawing per microbit like the program does
+
+    Parameters
+    ----------
+    numOfDevice: integer
+        the number of simulated microbits
+    rate: float
+        the number of samples per second sent by every simulator
+    seconds: float
+        the length of the replay
+    frameRate: integer
+        the number of times per second the samples are drained
+
+    Returns
+    -------
+    numOfSent: integer
+        the number of samples sent by all simulators
+    numOfReceived: integer
+        the number of samples drained from the group
+    frameTime: float
+        the average time in milliseconds to merge and draw the samples of one frame
+    stats: list
+        the stats of every microbit over the whole replay, see Microbit.getStats
+    '''
+    from GeoApp import HandDraw
+    simulators = [MicrobitSimulator() for i in range(numOfDevice)]
+    os.environ['MICROBIT_DEVICE'] = os.pathsep.join(simulator.device for simulator in simulators)
+    group = MicrobitGroup()
+    group.scan()
+    del os.environ['MICROBIT_DEVICE']
+    group.startReaders()
+    handDraws = [HandDraw() for i in range(numOfDevice)]
+    for handDraw in handDraws:
+        handDraw.drawing = True
+    for simulator in simulators:
+        simulator.start(syntheticTrace(int(rate*seconds)), rate)
+    numOfReceived = 0
+    frameTime = 0
+    numOfFrame = 0
+    while any(simulator.isRunning() for simulator in simulators) or any(mb.samples for mb in group.microbits):
+        time.sleep(1/frameRate)
+        start = time.perf_counter()
+        samples = group.readSamples()
+        batches = {}
+        for index, sample in samples:
+            batches.setdefault(index, []).append(sample)
+        for index, batch in batches.items():
+            handDraws[index].microDraw(batch)
+        frameTime += time.perf_counter() - start
+        numOfReceived += len(samples)
+        numOfFrame += 1
+    time.sleep(0.1) # let the readers finish the last lines
+    numOfReceived += len(group.readSamples())
+    stats = group.getStats()
+    group.close()
+    for simulator in simulators:
+        simulator.close()
+    return sum(simulator.numOfSent for simulator in simulators), numOfReceived, frameTime/numOfFrame*1000, stats
+
+
+def startupTime():
+    '''
+    This function starts the program without a window and stops it after its first frame
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    importTime: float
+        the time in milliseconds to import the program
+    firstFrameTime: float
+        the time in milliseconds from creating the program to displaying its first frame
+    '''
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    start = time.perf_counter()
+    import pygame as pg
+    import GeoApp
+    importTime = time.perf_counter() - start
+    pg.init()
+    directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as tempDir:
+        os.chdir(tempDir) # the store files are created here
+        try:
+            program = GeoApp.Program()
+            pg.event.post(pg.event.Event(pg.QUIT)) # the first frame is still drawn
+            program.run()
+        finally:
+            os.chdir(directory)
+    pg.quit()
+    return importTime*1000, program.firstFrameTime*1000
+
+
+def main():
+    '''
+    This function runs all benchmarks and prints the results
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    '''
+    importTime, firstFrameTime = startupTime()
+    print(f'startup: {importTime:.0f} ms importing, {firstFrameTime:.0f} ms to the first frame')
+    print(f'regular shape memory: {shapeMemory(makeRegShape):.0f} bytes per shape')
+    print(f'irregular shape memory (20 sides): {shapeMemory(makeIrregShape):.0f} bytes per shape')
+    print(f'irregular shape memory (200 sides): {shapeMemory(lambda: makeIrregShape(200), 1000):.0f} bytes per shape')
+    fileSize, peak = loaderMemory()
+    print(f'text loader peak memory: {peak/2**10:.0f} KiB for a {fileSize/2**20:.1f} MiB file')
+    print(f'binary file open: {binaryOpenTime():.1f} ms for 1000 shapes with 1000 points each')
+    textTime, binaryTime, textSize, binarySize = decodeTime()
+    print(f'microbit line drawn from one read vs one read per sample: ends {strokeChunking():.3f} px apart')
+    print(f'microbit decoding: text {textTime:.2f} us and {textSize:.1f} bytes per sample, '
+          f'binary {binaryTime:.2f} us and {binarySize:.0f} bytes per sample')
+    for protocol in ('text', 'auto'):
+        numOfSent, numOfReceived, dropped, drawTime = microbitThroughput(protocol=protocol)
+        print(f'microbit at 20000 samples/s ({protocol}): {numOfReceived} of {numOfSent} samples received, {dropped} dropped, '
+              f'{drawTime:.2f} ms drawing per frame')
+    for numOfDevice in (1, 4, 8):
+        numOfSent, numOfReceived, frameTime, stats = groupThroughput(numOfDevice)
+        latency = max(i['latency'] for i in stats)*1000
+        print(f'{numOfDevice} microbits at 5000 samples/s each: {numOfReceived} of {numOfSent} samples received, '
+              f'{frameTime:.2f} ms merging and drawing per frame, {latency:.1f} ms average latency (slowest microbit)')
+
+
+if __name__ == '__main__':
+    main()
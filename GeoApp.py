@@ -17,34 +17,58 @@
     
 
 import pygame as pg
-import math
-from decimal import Decimal
+import time
 from Microbit import *
-
-
-class RegShape:
+from Geometry import ORIGIN, PIXELS_PER_UNIT, ViewTransform, RegPolygon, IrregPolygon, niceNumber, regularOutline, tickLabel, tickValues
+from Storage import FileStore, SqliteStore, iterChunks
+from collections import OrderedDict
+
+SHAPE_STORE = 'file' # where the shapes are saved, 'file' (binary file and journal) or 'sqlite'
+GRID_CACHE_SIZE = 16 # the number of rendered coordinate planes kept, one per view
+TICK_SPACING = 50 # the distance in pixels between two grid lines is a nice number close to this
+WHEEL_ZOOM = 2**0.25 # the zoom of one step of the mouse wheel
+TEXT_CACHE_SIZE = 512 # the number of rendered texts kept
+ASSET_CACHE_SIZE = 16 # the number of scaled images kept
+IDLE_TIMEOUT = 500 # the longest time in milliseconds to sleep while waiting for an event
+FRAME_RATE = 100 # the frame rate while drawing or loading
+ANIMATION_FRAME_RATE = 30 # the lower frame rate while only an animation is running
+FADE_TIME = 4.65 # the number of seconds for a message to fade out
+REFERENCE_RATE = 100 # the microbit drawing moves as fast as one sample per frame did at 100 frames per second
+MAX_SAMPLE_GAP = 0.1 # the longest time in seconds one microbit sample is integrated over
+STROKE_COLORS = [(0, 0, 0), (220, 40, 40), (40, 90, 220), (30, 150, 60), (230, 130, 0), (150, 50, 190), (0, 160, 170), (200, 60, 140)] # the colors of the lines of the microbits, in the order they are found
+
+
+def getScreenRect(bounds, view):
+    '''
+    This function gets the area of the screen covered by a shape, including the width of its lines
+
+    Parameters
+    ----------
+    bounds: tuple
+        the bounding box of the shape in world units, see getBounds
+    view: ViewTransform
+        the view that maps world units onto the screen
+
+    Returns
+    -------
+    Rect
+        the screen area, limited to just around the screen
+    '''
+    corners = view.toScreen(bounds)
+    # the screen y-axis points down, so the corners are sorted again
+    left, right = sorted(min(max(x, -10), 1010) for x in corners[:, 0])
+    top, bottom = sorted(min(max(y, -10), 560) for y in corners[:, 1])
+    return pg.Rect(int(left) - 2, int(top) - 2, int(right - left) + 5, int(bottom - top) + 5)
+
+
+class RegShape(RegPolygon):
     """
-    A class used to represent a regular shape 
+    A class used to draw a regular shape, the geometry is kept by RegPolygon
     
     """
-    def __init__(self):
-        '''
-        This function initializes the regular shape's number of sides, its side length, its start point and its scale
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        -------
-        None
-        '''
-        self.numOfSide = None 
-        self.side = None # side length 
-        self.startPos = (250, 275)
-        self.scale = 1
-        
-    def draw(self, surfaceIn):
+    __slots__ = ()
+    
+    def draw(self, surfaceIn, view):
         '''
         This function draws the regular shape onto the screen
 
@@ -52,65 +76,47 @@ class RegShape:
         ----------
         surfaceIn: Surface
             the surface/screen where the regular shape is displaying to
+        view: ViewTransform
+            the view that maps world units onto the screen (zoomed in or zoomed out)
 
         Returns
         -------
         None
         '''
-        if self.numOfSide != None and self.side != None:
-            prevPos = self.startPos
-            angle = math.pi*2/self.numOfSide
-            for i in range(self.numOfSide):
-                nxtPos = (prevPos[0] + self.side*10*math.sin(angle*i)/self.scale, prevPos[1] + self.side*10*math.cos(angle*i)/self.scale)
-                pg.draw.line(surfaceIn, (0, 0, 0), prevPos, nxtPos, 2)
-                prevPos = nxtPos
+        if self.isComplete():
+            # the outline is shared by every shape with the same number of sides, side length and scale
+            outline = regularOutline(self.numOfSide, self.side, view.scale, view.origin)
+            pg.draw.lines(surfaceIn, (0, 0, 0), True, outline, 2)
             
-    def getPerimeter(self):
+    def getScreenRect(self, view):
         '''
-        This function calculates the perimeter of the regular shape
+        This function gets the area of the screen covered by the regular shape
 
         Parameters
         ----------
-        None
+        view: ViewTransform
+            the view that maps world units onto the screen (zoomed in or zoomed out)
 
         Returns
         -------
-        roundedPer: float
-            the perimeter of the regular shape that is rounded to second decimal place
-        '''
-        if self.numOfSide != None and self.side != None:
-            roundedPer = round((self.numOfSide * self.side), 2)
-            return roundedPer
-    
-    def getArea(self):
+        Rect
+            the screen area of the regular shape
         '''
-        This function calculates the area of the regular shape
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        -------
-        roundedArea: float
-            the area of the regular shape that is rounded to second decimal place
-        '''
-        if self.numOfSide != None and self.side != None:
-            angle = math.pi*2/self.numOfSide
-            roundedArea = round((((self.side)**2)*self.numOfSide)/(4*math.tan(angle/2)), 2)
-            return roundedArea
+        return getScreenRect(self.getBounds(), view)
        
         
-class IrregShape:
+class IrregShape(IrregPolygon):
     """
-    A class used to represent an irregular / customized shape
+    A class used to draw an irregular / customized shape from the user input, the geometry is kept by IrregPolygon
     
     """
+    __slots__ = ('numOfSide', 'side', 'angle', 'startIrregInput', 'finishDrawing', 'sideChanged', 'angleChanged',
+                 'localSideChanged', 'localAngleChanged', 'oldShape')
+    
     def __init__(self):
         '''
-        This function initializes the irregular / customized shape's number of sides, its side length input, its angle input,
-        its start point, its points positions and its scale. It also initializes the state of drawing (start drawing / start
-        inputting / finish drawing).
+        This function initializes the irregular / customized shape's number of sides, its side length input and its angle input.
+        It also initializes the state of drawing (start drawing / start inputting / finish drawing).
 
         Parameters
         ----------
@@ -120,6 +126,8 @@ class IrregShape:
         -------
         None
         '''
+        super().__init__()
+        
         self.numOfSide = None
         self.side = None
         self.angle = None
@@ -133,105 +141,77 @@ class IrregShape:
         self.localAngleChanged = False # store the angleChanged value locally
         
         self.oldShape = False # if this object is previously stored in the data
-        
-        self.startPos = [250, 275]
-        self.points = [self.startPos]
-        self.scale = 1
                 
-    def draw(self, surfaceIn, scale):
+    def step(self):
         '''
-        This function draws the irregular / customized shapes onto the screen
+        This function adds the next point of the irregular / customized shape once its side length
+        and angle are inputted, and closes the shape after the last point
 
         Parameters
         ----------
-        surfaceIn: Surface
-            the surface/screen where the regular shape is displaying to
-        scale: float
-            the new scale of the shape (zoomed in or zoomed out)
+        None
 
         Returns
         -------
-        None
+        Boolean
+            whether the points of the shape changed
         '''
+        numOfPoint = self.getNumOfPoint()
         if self.startIrregInput and not self.oldShape: # if the shape is new and start inputting
-            if self.scale != scale: # if the shape needs to be rescaled
-                # temporary points, used for recalculating the coordinate of next point when new scale is inputted
-                temPoints = [self.startPos]
-                for i in range(1, len(self.points)-1):
-                    temPoints.append([(self.points[i][0]-self.startPos[0])/scale*self.scale+self.startPos[0], (self.points[i][1] - self.startPos[1])/scale*self.scale+self.startPos[1]])
-                    # calculate the shortened distance between certain point / vertex to the starting point to rescale the shape
-                    self.points[i] = temPoints[i] # replace original points with newly calculated rescaled points
-                self.scale = scale
-            if len(self.points) == 1 and self.sideChanged: # first point only requires side length input
-                nxtPos = [self.points[-1][0] + self.side*10/self.scale, self.points[-1][1]]
-                self.points.append(nxtPos)
-            elif 1 < len(self.points) < self.numOfSide and self.changedIn(): # rest of the points require both side length and angle input
+            if self.getNumOfPoint() == 1 and self.sideChanged: # first point only requires side length input
+                self.addSide(self.side)
+            elif 1 < self.getNumOfPoint() < self.numOfSide and self.changedIn(): # rest of the points require both side length and angle input
                 # reset the local values to false
                 self.localSideChanged = False
                 self.localAngleChanged = False
                 # calculate next point
-                nxtPos = [self.points[-1][0] + self.side*10*math.cos(math.radians(360-self.angle))/self.scale, self.points[-1][1] + self.side*10*math.sin(math.radians(360-self.angle))/self.scale]
-                self.points.append(nxtPos)
-            elif len(self.points) == self.numOfSide: # automatically connect the last point and starting point as the last side drawn
-                nxtPos = self.startPos
-                self.points.append(nxtPos)
+                self.addSide(self.side, self.angle)
+            elif self.getNumOfPoint() == self.numOfSide: # automatically connect the last point and starting point as the last side drawn
+                self.close()
                 self.finishDrawing = True
-            for i in range(len(self.points)-1): # draw lines from the points list onto the screen
-                pg.draw.line(surfaceIn, (0, 0, 0), self.points[i], self.points[i+1], 2)
             # reset sideChanged and angleChanged after the boolean is stored into local variables
             self.sideChanged = False
             self.angleChanged = False
-        elif self.oldShape: # if the shape is previously stored
-            if self.scale != scale: # enable zoomed in and out feature
-                for i in range(1, len(self.points)-1):
-                    self.points[i] = [(self.points[i][0]-self.startPos[0])/scale*self.scale+self.startPos[0], (self.points[i][1] - self.startPos[1])/scale*self.scale+self.startPos[1]]
-                self.scale = scale
-            for i in range(len(self.points)-1): # draw lines from the points list onto the screen
-                pg.draw.line(surfaceIn, (0, 0, 0), self.points[i], self.points[i+1], 2)
-            
-    def changedIn(self):
+        return self.getNumOfPoint() != numOfPoint
+        
+    def draw(self, surfaceIn, view):
         '''
-        This function stores the booleans of whether the side and angle changed locally
+        This function draws the irregular / customized shapes onto the screen
 
         Parameters
         ----------
-        None
+        surfaceIn: Surface
+            the surface/screen where the regular shape is displaying to
+        view: ViewTransform
+            the view that maps world units onto the screen (zoomed in or zoomed out)
 
         Returns
         -------
-        bothChanged: Boolean
-            whether both side length and angle are inputted by the user
+        None
         '''
-        if self.sideChanged:
-            self.localSideChanged = True
-        if self.angleChanged:
-            self.localAngleChanged = True
-        bothChanged = self.localSideChanged and self.localAngleChanged
-        return bothChanged
-     
-    def getPerimeter(self):
+        if (self.startIrregInput or self.oldShape) and self.getNumOfPoint() > 1:
+            # transform all points onto the screen in one step and draw lines between them
+            pg.draw.lines(surfaceIn, (0, 0, 0), False, view.toScreen(self.coords).tolist(), 2)
+            
+    def getScreenRect(self, view):
         '''
-        This function calculates the perimeter of the drawn shape
+        This function gets the area of the screen covered by the irregular / customized shape
 
         Parameters
         ----------
-        None
+        view: ViewTransform
+            the view that maps world units onto the screen (zoomed in or zoomed out)
 
         Returns
         -------
-        roundedPer: float
-            the perimeter of the drawn shape that is rounded to second decimal place
+        Rect
+            the screen area of the irregular shape
         '''
-        perimeter = 0
-        for i in range(len(self.points)-1):
-            # calculate the distance between two adjacent vertexes / points
-            perimeter += (((self.points[i+1][0]/10-self.points[i][0]/10)*self.scale)**2 + ((self.points[i+1][1]/10 - self.points[i][1]/10)*self.scale)**2)**0.5
-        roundedPer = round(perimeter, 2)
-        return roundedPer
-    
-    def getArea(self):
+        return getScreenRect(self.getBounds(), view)
+            
+    def changedIn(self):
         '''
-        This function calculates the area of the drawn shape
+        This function stores the booleans of whether the side and angle changed locally
 
         Parameters
         ----------
@@ -239,19 +219,15 @@ class IrregShape:
 
         Returns
         -------
-        roundedArea: float
-            the area of the drawn shape that is rounded to second decimal place
+        bothChanged: Boolean
+            whether both side length and angle are inputted by the user
         '''
-        # shoelace theorem (only works if inputs are in a clockwise direction!)
-        # more information and specific formula on: https://artofproblemsolving.com/wiki/index.php/Shoelace_Theorem
-        sum1 = 0
-        sum2 = 0
-        for i in range(len(self.points)-1):
-            sum1 += self.points[i][0]*self.points[i+1][1]/100*(self.scale**2)
-            sum2 += self.points[i][1]*self.points[i+1][0]/100*(self.scale**2)
-        area = abs(sum1 - sum2)/2
-        roundedArea = round(area, 2)
-        return roundedArea
+        if self.sideChanged:
+            self.localSideChanged = True
+        if self.angleChanged:
+            self.localAngleChanged = True
+        bothChanged = self.localSideChanged and self.localAngleChanged
+        return bothChanged
 
 
 class HandDraw:
@@ -259,14 +235,17 @@ class HandDraw:
     A class used to represent hand drawing shapes (with mouse or microbit)
     
     """
-    def __init__(self):
+    def __init__(self, colorIn=(0, 0, 0), surfaceIn=None):
         '''
         This function initializes the mouse position, microbit position and its initial speed,
         the temporary surface to display to, and the detection of whether the drawing is started for the hand drawing option
 
         Parameters
         ----------
-        None
+        colorIn: tuple
+            the color of the line
+        surfaceIn: Surface
+            the temporary surface of another hand drawing to draw to as well, a new one is created if it is None
 
         Returns
         -------
@@ -274,14 +253,20 @@ class HandDraw:
         '''
         self.mousePrevPos = None # default mouse position to None
         
-        self.microPrevPos = (250, 275) # default microbit position to origin (on the customized coordinate plane)
+        self.microPrevPos = ORIGIN # default microbit position to origin (on the customized coordinate plane)
         self.speed = [0, 0] # default speed to 0 for both x and y componenets
+        self.lastSampleTime = None # the time of the last microbit sample
         
         self.drawing = False
+        self.changedRect = None # the area drawn on since it was last reported
+        self.color = colorIn
         
         # create a temporary surface to display the drawing to first, for later blitting the surface onto the main screen
-        self.temSurface = pg.Surface((700, 550))
-        self.temSurface.fill((255, 255, 255))
+        if surfaceIn != None:
+            self.temSurface = surfaceIn
+        else:
+            self.temSurface = pg.Surface((700, 550))
+            self.temSurface.fill((255, 255, 255))
     
     def move(self, xIn, yIn):
         '''
@@ -339,50 +324,90 @@ class HandDraw:
         newPos = self.move(self.speed[0], self.speed[1])
         return newPos
     
-    def microDraw(self, xIn, yIn):
+    def microDraw(self, samples):
         '''
-        This function draws the line traced by microbit
+        This function draws the line traced by microbit. Every sample is integrated over the time since the
+        sample before it, so the line does not depend on the frame rate or on how many samples arrive per frame
 
         Parameters
         ----------
-        xIn: float
-            the x component of the acceleration of the microbit (tilting from left to right)
-        yIn:float
-            the y component of the acceleration of the microbit (from forwards to backwards)
+        samples: list
+            the (time, x, y) samples of the acceleration of the microbit since the last frame, oldest first.
+            x is tilting from left to right and y is tilting from forwards to backwards
 
         Returns
         -------
         None
         '''
         if self.drawing: # when the microbit is connected
-            # reduce the sensitivity of the velocity of the drawing line to the tilting of the microbit
-            self.accelerate(-int(xIn)/1200,0) 
-            self.accelerate(0,-int(yIn)/1200)
-            # get new position of the microbit
-            newPos = self.update()
-            # draw line to the temporary surface
-            pg.draw.line(self.temSurface, (0, 0, 0), self.microPrevPos, newPos, 2)
-            self.microPrevPos = newPos
+            points = [self.microPrevPos]
+            for sample in samples:
+                # the number of reference frames since the last sample, the first sample counts as one
+                if self.lastSampleTime == None:
+                    steps = 1
+                else:
+                    steps = min(sample[0] - self.lastSampleTime, MAX_SAMPLE_GAP)*REFERENCE_RATE
+                self.lastSampleTime = sample[0]
+                # reduce the sensitivity of the velocity of the drawing line to the tilting of the microbit
+                self.accelerate(-int(sample[1])/1200*steps, -int(sample[2])/1200*steps)
+                # get new position of the microbit
+                points.append(self.move(self.speed[0]*steps, self.speed[1]*steps))
+                self.microPrevPos = points[-1]
+            if len(points) > 1:
+                # draw the whole batch to the temporary surface in one call
+                self.addChangedRect(pg.draw.lines(self.temSurface, self.color, False, points, 2))
             
-    def moDraw(self):
+    def moDraw(self, pos):
         '''
         This function draws the line traced by the mouse
 
         Parameters
         ----------
-        None
+        pos: tuple
+            the mouse position of the motion event, so every position of a burst of events is traced
 
         Returns
         -------
         None
         '''
         if self.drawing: # if the mouse button is pressed
-            pos = pg.mouse.get_pos() # get mouse position
             if self.mousePrevPos != None:
                 # draw line based on old and new mouse position to the temporary surface
-                pg.draw.line(self.temSurface, (0, 0, 0), self.mousePrevPos, pos, 2)
+                self.addChangedRect(pg.draw.line(self.temSurface, self.color, self.mousePrevPos, pos, 2))
             self.mousePrevPos = pos
             
+    def addChangedRect(self, rect):
+        '''
+        This function adds an area that was drawn on to the changed area
+
+        Parameters
+        ----------
+        rect: Rect
+            the area that was drawn on
+
+        Returns
+        -------
+        None
+        '''
+        self.changedRect = rect if self.changedRect == None else self.changedRect.union(rect)
+        
+    def getDirtyRect(self):
+        '''
+        This function reports the area drawn on since the last time it was reported
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Rect
+            the changed area, or None if nothing was drawn
+        '''
+        rect = self.changedRect
+        self.changedRect = None
+        return rect
+            
     def display(self, surfaceIn):
         '''
         This function displays the temporary surface onto the main screen
@@ -412,8 +437,9 @@ class HandDraw:
         None
         '''
         self.mousePrevPos = None
-        self.microPrevPos = (250, 275)
+        self.microPrevPos = ORIGIN
         self.speed = [0, 0]
+        self.lastSampleTime = None
         
     def reset(self):
         '''
@@ -428,95 +454,491 @@ class HandDraw:
         None
         '''
         self.temSurface.fill((255, 255, 255))
+        self.addChangedRect(self.temSurface.get_rect())
         self.lineCut()
     
     
+class TextCache:
+    """
+    A class used to represent the rendered texts shared by every widget, so a text is only
+    rendered once as long as it keeps being displayed
+    
+    """
+    def __init__(self, maxSize=TEXT_CACHE_SIZE):
+        '''
+        This function initializes the cache and its hit and miss counters
+
+        Parameters
+        ----------
+        maxSize: integer
+            the number of rendered texts kept, the least recently used one is removed first
+
+        Returns
+        -------
+        None
+        '''
+        self.maxSize = maxSize
+        self.surfaces = OrderedDict()
+        self.hits = 0 # the number of texts found in the cache
+        self.misses = 0 # the number of texts rendered
+        
+    def render(self, FONT, text, color, antialias=True):
+        '''
+        This function gets a rendered text, it is only rendered if it is not in the cache
+
+        Parameters
+        ----------
+        FONT: Object
+            the font that the text is displayed in
+        text: String
+            the text
+        color: tuple
+            the color of the text
+        antialias: Boolean
+            if the edges of the text are smoothed
+
+        Returns
+        -------
+        Surface
+            the rendered text, which is shared and must not be drawn on
+        '''
+        key = (FONT, text, tuple(color), antialias)
+        txtSurf = self.surfaces.get(key)
+        if txtSurf != None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return txtSurf
+        self.misses += 1
+        txtSurf = FONT.render(text, antialias, color)
+        self.surfaces[key] = txtSurf
+        if len(self.surfaces) > self.maxSize:
+            self.surfaces.popitem(last=False)
+        return txtSurf
+        
+    def getStats(self):
+        '''
+        This function gets the hit and miss counters of the cache
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        hits: integer
+            the number of texts found in the cache
+        misses: integer
+            the number of texts rendered
+        size: integer
+            the number of texts in the cache
+        '''
+        return self.hits, self.misses, len(self.surfaces)
+        
+        
+textCache = TextCache() # the rendered texts shared by every widget
+
+
+class AssetManager:
+    """
+    A class used to represent the images of the program, loaded and converted once, scaled once
+    for every size they are displayed at, and the screens that never change composed once
+    
+    """
+    def __init__(self, maxSize=ASSET_CACHE_SIZE):
+        '''
+        This function initializes the caches, the images are loaded the first time they are needed
+
+        Parameters
+        ----------
+        maxSize: integer
+            the number of scaled images kept, the least recently used one is removed first
+
+        Returns
+        -------
+        None
+        '''
+        self.maxSize = maxSize
+        self.images = {} # the loaded images by file name
+        self.scaledImages = OrderedDict() # the scaled images by file name and size
+        self.screens = {} # the composed screens by name
+        
+    def getImage(self, fileName, size=None):
+        '''
+        This function gets an image converted to the format of the screen, it is only loaded and
+        scaled if it is not in the cache
+
+        Parameters
+        ----------
+        fileName: String
+            the name of the image file
+        size: tuple
+            the width and height the image is displayed at, or None for its own size
+
+        Returns
+        -------
+        Surface
+            the image, which is shared and must not be drawn on
+        '''
+        image = self.images.get(fileName)
+        if image == None:
+            image = pg.image.load(fileName).convert_alpha()
+            self.images[fileName] = image
+        if size == None or image.get_size() == tuple(size):
+            return image
+        key = (fileName, tuple(size))
+        scaledImage = self.scaledImages.get(key)
+        if scaledImage != None:
+            self.scaledImages.move_to_end(key)
+            return scaledImage
+        scaledImage = pg.transform.scale(image, size)
+        self.scaledImages[key] = scaledImage
+        if len(self.scaledImages) > self.maxSize:
+            self.scaledImages.popitem(last=False)
+        return scaledImage
+        
+    def getScreen(self, name, size, compose):
+        '''
+        This function gets a screen that never changes, it is only composed the first time
+
+        Parameters
+        ----------
+        name: String
+            the name of the screen
+        size: tuple
+            the width and height of the screen
+        compose: function
+            draws the screen onto the surface it is given
+
+        Returns
+        -------
+        Surface
+            the composed screen
+        '''
+        screen = self.screens.get(name)
+        if screen == None or screen.get_size() != tuple(size):
+            screen = pg.Surface(size).convert()
+            compose(screen)
+            self.screens[name] = screen
+        return screen
+
+
+class Tween:
+    """
+    A class used to represent a value that changes from a start value to an end value over a
+    period of time, measured with a monotonic clock
+    
+    """
+    def __init__(self, start, end, duration):
+        '''
+        This function initializes the values and the duration, the tween starts right away
+
+        Parameters
+        ----------
+        start: float
+            the value at the start
+        end: float
+            the value at the end
+        duration: float
+            the number of seconds to change from the start value to the end value
+
+        Returns
+        -------
+        None
+        '''
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.startTime = time.monotonic()
+        
+    def restart(self):
+        '''
+        This function starts the tween again from its start value
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.startTime = time.monotonic()
+        
+    def getValue(self, now=None):
+        '''
+        This function gets the value at a point in time
+
+        Parameters
+        ----------
+        now: float
+            the monotonic time, the current time if it is None
+
+        Returns
+        -------
+        float
+            the value, linearly changed from the start value to the end value
+        '''
+        if now == None:
+            now = time.monotonic()
+        progress = min(max((now - self.startTime)/self.duration, 0), 1)
+        return self.start + (self.end - self.start)*progress
+    
+    def isDone(self, now=None):
+        '''
+        This function detects if the tween reached its end value
+
+        Parameters
+        ----------
+        now: float
+            the monotonic time, the current time if it is None
+
+        Returns
+        -------
+        Boolean
+            whether the tween is done
+        '''
+        if now == None:
+            now = time.monotonic()
+        return now - self.startTime >= self.duration
+
+
+class Animator:
+    """
+    A class used to represent every running tween, so the program knows when nothing is animating
+    
+    """
+    def __init__(self):
+        '''
+        This function initializes the list of running tweens
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.tweens = []
+        
+    def add(self, tween):
+        '''
+        This function adds a running tween
+
+        Parameters
+        ----------
+        tween: Tween
+            the tween
+
+        Returns
+        -------
+        None
+        '''
+        self.tweens.append(tween)
+        
+    def isActive(self):
+        '''
+        This function detects if any tween is still running, and forgets the tweens that are done
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Boolean
+            whether there is a running tween
+        '''
+        now = time.monotonic()
+        self.tweens = [i for i in self.tweens if not i.isDone(now)]
+        return len(self.tweens) > 0
+        
+        
+animator = Animator() # the running tweens of every widget
+
+
 class CoordinatePlane:
     """
     A class used to represent the coordinate plane
     
     """
-    def __init__(self, SMALLFONTIn):
+    def __init__(self, SMALLFONTIn, viewIn):
         '''
-        This function initializes the origin of the coordinate plane,
-        the font to display the numbers on the axes, the axes and its scale
+        This function initializes the view of the coordinate plane (its origin and its scale)
+        and the font to display the numbers on the axes
 
         Parameters
         ----------
         SMALLFONTIn: Object
             the small font that the numbers on the axes display in
+        viewIn: ViewTransform
+            the view shared with the shapes, which holds the origin and the scale
 
         Returns
         -------
         None
         '''
-        self.origin = (250, 275)
-        # the line of axes from its start point to its end point
-        self.yAxis = (250, 550), (250, 0)
-        self.xAxis = (0, 275), (700, 275)
-        
+        self.view = viewIn
         self.FONT = SMALLFONTIn
         
-        self.scale = 1
+        # the rendered coordinate planes by scale and origin, the least recently used one is removed first
+        self.gridCache = OrderedDict()
         
     def draw(self, surfaceIn):
         '''
-        This function draws the coordinate plane onto a
-        temporary surface in a customized scale and then display the surface to the main screen
+        This function draws the coordinate plane in the current view onto the main screen. The plane is
+        only rendered the first time a view is shown, after that the cached surface is reused
 
         Parameters
         ----------
         surfaceIn: Surface
-            the small font that the numbers on the axes display in
+            the surface/screen where the coordinate plane is displaying to
 
         Returns
         -------
         None
         '''
+        key = (self.view.scale, self.view.origin)
+        if key in self.gridCache:
+            self.gridCache.move_to_end(key)
+        else:
+            self.gridCache[key] = self.renderGrid(*key)
+            if len(self.gridCache) > GRID_CACHE_SIZE:
+                self.gridCache.popitem(last=False)
+        surfaceIn.blit(self.gridCache[key], (0, 0)) # blit the cached surface onto the main screen
+        
+    def renderGrid(self, scale, origin):
+        '''
+        This function draws the grid lines, the numbers and the axes of the coordinate plane
+        onto a new transparent surface. The distance between two grid lines is a nice number
+        close to TICK_SPACING pixels, so only the visible grid lines are calculated
+
+        Parameters
+        ----------
+        scale: float
+            the zoom level of the coordinate plane
+        origin: tuple
+            the screen position of the origin
+
+        Returns
+        -------
+        Surface
+            the rendered coordinate plane
+        '''
         # create temporary surface and set it to transparent
         temSurface = pg.Surface((700, 550))
         temSurface.set_colorkey((0, 0, 0))
-        # set the min and max of the zoom in and out feature
-        if self.scale < 2**-3:
-            self.scale = 2**-3
-        elif self.scale > 2**9:
-            self.scale = 2**9
-        # display numbers labeled on the x-axis
-        for i in range(700):
-            # if scale is large enough, the number displayed are integers
-            if self.scale > 2:
-                if i % 100 == 0: # fixed distance between two numbers, prevent the gap to become too wide
-                    txt = str(int((i//10-25)*self.scale))
-                    temSurface.blit(self.FONT.render(txt, True, (100, 100, 100)), (i, 280))
-                    pg.draw.line(temSurface, (200, 200, 200), (i, 0), (i, 550))
-            else: # if scale is smaller, the number displayed are floats
-                if i%(50*self.scale) == 0:
-                    if self.scale == 2 or self.scale == 1:
-                        txt = str(int((i//10-25)*self.scale))
-                    else:
-                        txt = str(round((i//10-25)*self.scale, 2))
-                    temSurface.blit(self.FONT.render(txt, True, (100, 100, 100)), (i, 280))
-                    pg.draw.line(temSurface, (200, 200, 200), (i, 0), (i, 550))
-        # display numbers labeled on the y-axis
-        for i in range(550):
-            # if scale is large enough, the number displayed are integers. Prevent overlapping numbers from both axes at the origin.
-            if self.scale > 2 and (i < 270 or i > 280):
-                if i % 100 == 0: # fixed distance between two numbers, prevent the gap to become too wide
-                    txt = str(int((28 - i//10)*self.scale))
-                    temSurface.blit(self.FONT.render(txt, True, (100, 100, 100)), (255, i))
-                    pg.draw.line(temSurface, (200, 200, 200), (0, i), (700, i))
-            else: # if scale is smaller, the number displayed are floats. Prevent overlapping numbers.
-                if i%(50*self.scale) == 0 and (i < 270 or i > 280):
-                    if self.scale == 2 or self.scale ==1:
-                        txt = str(int((28 - i//10)*self.scale))
-                    else:
-                        txt = str(round((28 - i//10)*self.scale, 2))
-                    temSurface.blit(self.FONT.render(txt, True, (100, 100, 100)), (255, i))
-                    pg.draw.line(temSurface, (200, 200, 200), (0, i), (700, i))
+        originX, originY = origin
+        factor = PIXELS_PER_UNIT/scale
+        step = niceNumber(TICK_SPACING/factor)
+        # keep the numbers on the screen when the axes are outside of it
+        labelX = min(max(originX + 5, 0), 660)
+        labelY = min(max(originY + 5, 0), 535)
+        # display numbers labeled on the x-axis, long numbers skip the ticks they would overlap
+        labelEnd = -700
+        for value in tickValues(-originX/factor, (700 - originX)/factor, step):
+            i = round(originX + value*factor)
+            if i > labelEnd:
+                txtSurf = textCache.render(self.FONT, tickLabel(value, step), (100, 100, 100))
+                temSurface.blit(txtSurf, (i, labelY))
+                labelEnd = i + txtSurf.get_width() + 5
+            pg.draw.line(temSurface, (200, 200, 200), (i, 0), (i, 550))
+        # display numbers labeled on the y-axis, the screen y-axis points down
+        for value in tickValues((originY - 550)/factor, originY/factor, step):
+            i = round(originY - value*factor)
+            if abs(value) >= step/2: # prevent overlapping numbers from both axes at the origin
+                temSurface.blit(textCache.render(self.FONT, tickLabel(value, step), (100, 100, 100)), (labelX, i))
+            pg.draw.line(temSurface, (200, 200, 200), (0, i), (700, i))
         # draw axes
-        pg.draw.line(temSurface, (100, 100, 100), (250, 550), (250, 0))
-        pg.draw.line(temSurface, (100, 100, 100), (0, 275), (700, 275))
-        surfaceIn.blit(temSurface, (0, 0)) # blit the temporary surface onto the main screen
+        pg.draw.line(temSurface, (100, 100, 100), (originX, 550), (originX, 0))
+        pg.draw.line(temSurface, (100, 100, 100), (0, originY), (700, originY))
+        return temSurface
+    
+    
+class ShapeLayer:
+    """
+    A class used to represent the finished shapes rendered once onto a transparent surface, which is
+    only rendered again when the view changes
+    
+    """
+    def __init__(self, sizeIn):
+        '''
+        This function initializes the size of the layer and the shapes that still need to be rendered
+
+        Parameters
+        ----------
+        sizeIn: tuple
+            the size of the layer
+
+        Returns
+        -------
+        None
+        '''
+        self.size = sizeIn
+        self.surface = None # the rendered shapes
+        self.key = None # the scale and the origin of the view the shapes are rendered in
+        self.newShapes = [] # the shapes finished after the layer was rendered
+        
+    def addShapes(self, shapes):
+        '''
+        This function adds finished shapes, they are rendered onto the layer the next time it is drawn
+
+        Parameters
+        ----------
+        shapes: list
+            the finished shapes
+
+        Returns
+        -------
+        None
+        '''
+        self.newShapes.extend(shapes)
+        
+    def reset(self):
+        '''
+        This function clears the layer, every shape is rendered again the next time it is drawn
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.surface = None
+        self.newShapes = []
+        
+    def draw(self, surfaceIn, shapes, view):
+        '''
+        This function draws the finished shapes onto the screen, rendering only the shapes
+        that are not rendered onto the layer yet
+
+        Parameters
+        ----------
+        surfaceIn: Surface
+            the surface/screen where the shapes are displaying to
+        shapes: list
+            every shape of this layer, the last one is still being inputted and is not rendered
+        view: ViewTransform
+            the view that maps world units onto the screen (zoomed in or zoomed out)
+
+        Returns
+        -------
+        None
+        '''
+        key = (view.scale, view.origin)
+        if self.surface == None or key != self.key:
+            # create the transparent layer and render every finished shape
+            self.surface = pg.Surface(self.size)
+            self.surface.fill((255, 255, 255))
+            self.surface.set_colorkey((255, 255, 255))
+            self.key = key
+            self.newShapes = [shapes[i] for i in range(len(shapes) - 1)]
+        for i in self.newShapes:
+            i.draw(self.surface, view)
+        self.newShapes = []
+        surfaceIn.blit(self.surface, (0, 0))
     
     
 class Button:
@@ -544,11 +966,12 @@ class Button:
         self.rect = rectIn
         
         self.txt = text
-        self.txtSurf = FONT.render(text, True, (255, 255, 255))
+        self.txtSurf = textCache.render(FONT, text, (255, 255, 255))
         
         self.color = (116, 116, 117)
         
         self.buttonActive = False # detect if the button is pressed
+        self.reportedActive = None # whether the button was pressed when it was last reported
         
     def draw(self, surfaceIn):
         '''
@@ -573,6 +996,24 @@ class Button:
         txtRect = self.txtSurf.get_rect(center=((2*self.rect[0]+self.rect[2])/2 , (2*self.rect[1]+self.rect[3])/2))
         surfaceIn.blit(self.txtSurf, txtRect)
         
+    def getDirtyRect(self):
+        '''
+        This function reports the area of the button if its color changed since the last time it was reported
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Rect
+            the area of the button, or None if it did not change
+        '''
+        if self.buttonActive != self.reportedActive:
+            self.reportedActive = self.buttonActive
+            return pg.Rect(self.rect)
+        return None
+        
     def mouseCollide(self):
         '''
         This function detects if the mouse is on the button
@@ -623,14 +1064,17 @@ class UserInput:
         self.rect = pg.Rect(rectIn) # store the input as a rectangle
         
         self.title = titleIn
-        self.titleSurf = FONT.render(titleIn, True, (100, 100, 100))
+        self.titleSurf = textCache.render(FONT, titleIn, (100, 100, 100))
         
         # set the default text inside the input box
         self.txt = ""
-        self.txtSurf = FONT.render(self.txt, True, self.color)
+        self.txtSurf = textCache.render(FONT, self.txt, self.color)
         
         self.active = False # if the input box is being inputted
         
+        self.reportedState = None # the text, the color and the width of the input box when it was last reported
+        self.reportedRect = None # the area of the input box when it was last reported
+        
     def mouseCollide(self):
         '''
         This function detects if the mouse is on the input box
@@ -688,6 +1132,30 @@ class UserInput:
         # draw input box
         pg.draw.rect(surfaceIn, self.color, self.rect, 2)
         
+    def getDirtyRect(self):
+        '''
+        This function reports the area of the input box and its title if the text, the color or the width
+        changed since the last time it was reported
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Rect
+            the old and the new area of the input box, or None if it did not change
+        '''
+        state = (self.txtSurf, self.color, self.rect.w)
+        if state == self.reportedState:
+            return None
+        rect = self.rect.union(self.titleSurf.get_rect(topright=((self.rect.x-5),(self.rect.y+5))))
+        rect = rect.union(self.txtSurf.get_rect(topleft=(self.rect.x + 5, self.rect.y + 5)))
+        dirtyRect = rect if self.reportedRect == None else rect.union(self.reportedRect)
+        self.reportedState = state
+        self.reportedRect = rect
+        return dirtyRect
+        
         
 class DisplayMsg:
     """
@@ -713,15 +1181,18 @@ class DisplayMsg:
         self.FONT = FONTIn
         
         self.color = (100, 100, 100) # the color of the font
+        self.alpha = 255 # the opacity of the text, 0 when it is faded out
+        self.fade = None # the tween of the opacity while the text is fading
         
-        self.frameCount = 0 # set the timer using the number of frames counted
+        self.txtSurf = None # a copy of the rendered text, so its opacity can be changed
+        self.surfTxt = None # the text of the copy
         
-        self.change = False # if the text is changed
-        self.updateColor = False # if the color needs to be reset (a boolean to control a run-once loop)
+        self.reportedState = None # the text and its opacity when it was last reported
+        self.reportedRect = None # the area of the text when it was last reported
     
     def txtChange(self):
         '''
-        This function detects if the text that needs to be displayed has changed
+        This function detects if the text that needs to be displayed has changed and starts fading it out
 
         Parameters
         ----------
@@ -731,12 +1202,34 @@ class DisplayMsg:
         -------
         None
         '''
-        self.change = True
-        self.updateColor = True
+        if self.fade != None and self.fade in animator.tweens:
+            # the text is still fading, fade it out again from the start instead of adding another tween
+            self.fade.restart()
+        else:
+            self.fade = Tween(255, 0, FADE_TIME)
+            animator.add(self.fade)
+        self.alpha = 255
+        
+    def hold(self):
+        '''
+        This function keeps the text that is fading fully visible, it fades out once it is not held anymore
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.fade != None:
+            self.fade.restart()
+            self.alpha = 255
         
     def update(self):
         '''
-        This function updates the display of the text to achieve the fading effect
+        This function updates the opacity of the text to achieve the fading effect, the speed of
+        the fade does not depend on the frame rate
 
         Parameters
         ----------
@@ -746,14 +1239,29 @@ class DisplayMsg:
         -------
         None
         '''
-        if self.change:
-            if self.updateColor: # reset the color when the text is first changed
-                self.color = (100, 100, 100)
-                self.updateColor = False
-            self.frameCount += 1 # increase the frame count
-            if (self.frameCount % 3 == 0) and self.color != (255, 255, 255):
-                self.color = (self.color[0]+1, self.color[1]+1, self.color[2]+1) # fading effect of the text
+        if self.fade != None:
+            self.alpha = round(self.fade.getValue())
+            if self.fade.isDone():
+                self.fade = None
     
+    def getTxtSurf(self):
+        '''
+        This function gets the rendered text, it is only copied out of the text cache when the text changes
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Surface
+            the rendered text
+        '''
+        if self.txt != self.surfTxt:
+            self.txtSurf = textCache.render(self.FONT, self.txt, self.color).copy()
+            self.surfTxt = self.txt
+        return self.txtSurf
+        
     def draw(self, surfaceIn, screenSize):
         '''
         This function displays the text onto the screen
@@ -769,9 +1277,34 @@ class DisplayMsg:
         -------
         None
         '''
-        txtSurf = self.FONT.render(self.txt, True, self.color)
-        txtRect = txtSurf.get_rect(center = (screenSize[0]/2, screenSize[1]-20))
-        surfaceIn.blit(txtSurf, txtRect)
+        if self.alpha > 0:
+            txtSurf = self.getTxtSurf()
+            txtSurf.set_alpha(self.alpha)
+            txtRect = txtSurf.get_rect(center = (screenSize[0]/2, screenSize[1]-20))
+            surfaceIn.blit(txtSurf, txtRect)
+        
+    def getDirtyRect(self, screenSize):
+        '''
+        This function reports the area of the text if the text or its opacity changed since the last time it was reported
+
+        Parameters
+        ----------
+        screenSize: tuple
+            the size of the screen
+
+        Returns
+        -------
+        Rect
+            the old and the new area of the text, or None if it did not change
+        '''
+        state = (self.txt, self.alpha)
+        if state == self.reportedState:
+            return None
+        rect = self.getTxtSurf().get_rect(center = (screenSize[0]/2, screenSize[1]-20))
+        dirtyRect = rect if self.reportedRect == None else rect.union(self.reportedRect)
+        self.reportedState = state
+        self.reportedRect = rect
+        return dirtyRect
         
         
 class Text:
@@ -797,7 +1330,7 @@ class Text:
         None
         '''
         self.text = textIn
-        self.textSurf = FONTIn.render(self.text, True, (0, 0, 0))
+        self.textSurf = textCache.render(FONTIn, self.text, (0, 0, 0))
         self.rect = self.textSurf.get_rect()
         self.rect.center = centerRectIn
         
@@ -834,6 +1367,10 @@ class Program:
         -------
         None
         '''
+        # the time the program started, to measure the time until the first frame is displayed
+        self.startTime = time.perf_counter()
+        self.firstFrameTime = None # the number of seconds from starting to the first frame
+        
         # set up the main screen
         self.screenSize = (700, 550)
         self.screen = pg.display.set_mode(self.screenSize)
@@ -855,8 +1392,11 @@ class Program:
         self.irregShape = []
         self.irregShape.append(IrregShape())
         
+        # create the view that maps the shapes in world units onto the screen
+        self.view = ViewTransform()
+        
         # create coordinate plane and default it to not showing
-        self.coordPlane = CoordinatePlane(self.SMALLFONT)
+        self.coordPlane = CoordinatePlane(self.SMALLFONT, self.view)
         self.showCoord = False
         
         # create display message
@@ -867,13 +1407,24 @@ class Program:
         self.shouldMouseDraw = False
         self.mouseMove = False
         
-        # create microbit drawing object and microbit
-        self.microbitDraw = HandDraw()
-        self.mb = Microbit()
+        # create microbit drawing objects and microbits, every microbit draws its own line to the surface of the first one
+        self.microbitDraw = HandDraw(STROKE_COLORS[0])
+        self.microbitStrokes = [self.microbitDraw]
+        self.mb = MicrobitGroup()
+        self.mb.startReaders() # read every microbit on its own background thread, so a slow port never drops frames
         
         # detect if the clear button is not pressed
         self.shouldDraw = True
         
+        # the finished regular and irregular shapes, rendered once
+        self.regLayer = ShapeLayer(self.screenSize)
+        self.irregLayer = ShapeLayer(self.screenSize)
+        
+        # the areas of the screen that changed since the last frame, only these are drawn again
+        self.dirtyRects = []
+        self.waitedEvent = None # the event that ended the last idle wait
+        self.lastScene = None # the screen, the view and the visible input boxes of the last frame
+        
         # create a user input box list
         self.userInGroup = []
         # number of sides in regular shapes
@@ -957,13 +1508,14 @@ class Program:
         # tutorial text 14
         self.txtGroup.append(Text("remember to input the points in a clockwise direction!", (230, 500), self.BIGFONT))
         
-        # create an image list
-        self.imgGroup = []
-        # load images for displaying in the tutorial
-        self.imgGroup.append(pg.image.load("calculateButtonImg.png").convert_alpha())
-        self.imgGroup.append(pg.image.load("clearButtonImg.png").convert_alpha())
-        self.imgGroup.append(pg.image.load("CoordButtonImg.png").convert_alpha())
-        self.imgGroup.append(pg.image.load("shapes.png").convert_alpha())
+        # the images and the screens that never change, loaded and composed the first time they are displayed
+        self.assets = AssetManager()
+        
+        # where the shapes are saved, and the stored shapes that are still being loaded
+        self.store = None
+        self.loader = None
+        self.numOfLoadedReg = 0
+        self.numOfLoadedIrreg = 0
         
         self.end = False  # if the program ends
         self.clock = pg.time.Clock()
@@ -993,22 +1545,52 @@ class Program:
         None
         '''
         if self.gameState == -0.5:
-            self.screen.fill((255, 255, 255))
-            self.txtGroup[0].draw(self.screen)
             # set up the background and display the text on the start screen
+            self.screen.blit(self.assets.getScreen('start', self.screenSize, self.composeStartScreen), (0, 0))
             self.gameState = 0
         elif self.gameState == 0.5:
-            # set up the background for the tutorial screen
-            self.screen.fill((255, 255, 255))
-            # display all of the texts
-            for i in range(1, 16):
-                self.txtGroup[i].draw(self.screen)
-            # display all of the images
-            self.screen.blit(pg.transform.scale(self.imgGroup[0], (1000, 550)), (100, 150))            
-            self.screen.blit(pg.transform.scale(self.imgGroup[1], (1200, 600)), (75, 310))       
-            self.screen.blit(pg.transform.scale(self.imgGroup[2], (800, 400)), (500, 225))
-            self.screen.blit(pg.transform.scale(self.imgGroup[3], (1000, 400)), (475, 50))
+            # set up the tutorial screen, it is composed the first time it is displayed
+            self.screen.blit(self.assets.getScreen('tutorial', self.screenSize, self.composeTutorialScreen), (0, 0))
             self.gameState = 1
+            
+    def composeStartScreen(self, surfaceIn):
+        '''
+        This function draws the background and the text of the start screen
+
+        Parameters
+        ----------
+        surfaceIn: Surface
+            the surface the start screen is drawn to
+
+        Returns
+        -------
+        None
+        '''
+        surfaceIn.fill((255, 255, 255))
+        self.txtGroup[0].draw(surfaceIn)
+            
+    def composeTutorialScreen(self, surfaceIn):
+        '''
+        This function draws the background, the texts and the images of the tutorial screen
+
+        Parameters
+        ----------
+        surfaceIn: Surface
+            the surface the tutorial screen is drawn to
+
+        Returns
+        -------
+        None
+        '''
+        surfaceIn.fill((255, 255, 255))
+        # display all of the texts
+        for i in range(1, 16):
+            self.txtGroup[i].draw(surfaceIn)
+        # display all of the images
+        surfaceIn.blit(self.assets.getImage("calculateButtonImg.png", (1000, 550)), (100, 150))
+        surfaceIn.blit(self.assets.getImage("clearButtonImg.png", (1200, 600)), (75, 310))
+        surfaceIn.blit(self.assets.getImage("CoordButtonImg.png", (800, 400)), (500, 225))
+        surfaceIn.blit(self.assets.getImage("shapes.png", (1000, 400)), (475, 50))
         
     def run(self):
         '''
@@ -1028,19 +1610,113 @@ class Program:
             self.runOnce()
             self.event()
             self.update()
-            self.draw()
-            pg.display.flip() # display
-            self.clock.tick(100) # force frame rate to be lower
-        # if there is a microbit, close connection
-        if self.mb.microbit != None:
-            self.mb.closeConnection()
-        # store the data when the program is closed
-        self.storeData()
+            self.collectDirtyRects()
+            if self.dirtyRects: # an unchanged screen is not drawn again
+                # only draw inside the changed areas and only display those areas
+                self.screen.set_clip(self.dirtyRects[0].unionall(self.dirtyRects[1:]))
+                self.draw()
+                self.screen.set_clip(None)
+                pg.display.update(self.dirtyRects)
+                self.dirtyRects = []
+                if self.firstFrameTime == None:
+                    self.firstFrameTime = time.perf_counter() - self.startTime
+            frameRate = self.getFrameRate()
+            if frameRate == FRAME_RATE:
+                self.clock.tick(FRAME_RATE) # force frame rate to be lower
+            else:
+                # sleep until the next event, or until the next animation frame, instead of running frames that change nothing
+                self.waitedEvent = pg.event.wait(IDLE_TIMEOUT if frameRate == 0 else 1000//frameRate)
+                if self.waitedEvent.type == pg.NOEVENT:
+                    self.waitedEvent = None
+        # stop reading the microbits and close their connections
+        self.mb.close()
+        # every finished shape is already saved, only compact the store if it grew too long
+        self.compactIfNeeded()
+        self.store.close()
+        
+    def getFrameRate(self):
+        '''
+        This function gets the frame rate needed until the next user event
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        integer
+            FRAME_RATE while a screen is being set up, shapes are loading or the microbit is read,
+            ANIMATION_FRAME_RATE while only an animation is running, and 0 if nothing can change
+        '''
+        if self.gameState == -0.5 or self.gameState == 0.5 or self.gameState == 6 or self.loader != None:
+            return FRAME_RATE
+        if animator.isActive():
+            return ANIMATION_FRAME_RATE
+        return 0
+        
+    def markDirty(self, rect=None):
+        '''
+        This function marks an area of the screen to be drawn again in the next frame
+
+        Parameters
+        ----------
+        rect: Rect
+            the changed area, the whole screen if it is None
+
+        Returns
+        -------
+        None
+        '''
+        if rect == None:
+            rect = self.screen.get_rect()
+        self.dirtyRects.append(rect)
         
+    def collectDirtyRects(self):
+        '''
+        This function collects the areas of the screen that changed in this frame. The whole screen is
+        drawn again if the screen, the view or the visible input boxes changed, otherwise only the
+        widgets that report a change are drawn again
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        scene = (self.gameState, self.showCoord, self.shouldDraw, self.view.scale, self.view.origin, self.irregShape[-1].startIrregInput)
+        if scene != self.lastScene:
+            self.lastScene = scene
+            self.markDirty()
+        for widget in self.buttonGroup + self.userInGroup + [self.mouseDraw] + self.microbitStrokes:
+            rect = widget.getDirtyRect()
+            if rect != None:
+                self.markDirty(rect)
+        rect = self.displayMsg.getDirtyRect(self.screenSize)
+        if rect != None:
+            self.markDirty(rect)
+        
+    def compactIfNeeded(self):
+        '''
+        This function compacts the store once its journal is larger than the save file,
+        so saving stays proportional to the changed data
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.loader == None and self.store.needsCompaction():
+            self.storeData()
+            
     def storeData(self):
         '''
-        This function stores the data of regular shapes and irregular shapes
-        that were not cleared before the program ends
+        This function stores the data of regular shapes and irregular shapes that were not
+        cleared, replacing everything in the store
 
         Parameters
         ----------
@@ -1050,23 +1726,38 @@ class Program:
         -------
         None
         '''
-        with open('storeData.txt', 'w') as file:
-            storeRegStr = []
-            if len(self.regShape) >= 2:
-                # store the number of sides and side length of regular shapes
-                for i in self.regShape:
-                    storeRegStr += (i.numOfSide, i.side)
-            file.write(f'{storeRegStr}\n')
-            if len(self.irregShape) >= 2:
-                # store the coordinates of points / vertexes of irregular shapes on separate lines
-                for i in self.irregShape:
-                    file.write(f'{i.points}\n')
-            file.write('\n') # create new line
+        # load the stored shapes that are not loaded yet, otherwise they would be lost
+        while self.loader != None:
+            self.loadNextChunk()
+        # only store the shapes that are finished
+        regLst = [i for i in self.regShape if i.isComplete()]
+        irregLst = [i for i in self.irregShape if i.oldShape or i.finishDrawing]
+        self.store.compact(regLst, irregLst)
             
     def readData(self):
         '''
-        This function reads the stored data of regular shapes and irregular shapes
-        when the program is first opened
+        This function starts reading the stored data of regular shapes and irregular shapes
+        when the program is first opened. Only the first chunk of shapes is loaded here,
+        the rest is streamed in by loadNextChunk while the program is already running
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if SHAPE_STORE == 'sqlite':
+            self.store = SqliteStore()
+        else:
+            self.store = FileStore()
+        self.loader = iterChunks(self.store.load())
+        self.loadNextChunk()
+        
+    def loadNextChunk(self):
+        '''
+        This function creates the shape objects of the next chunk of stored data
 
         Parameters
         ----------
@@ -1076,34 +1767,35 @@ class Program:
         -------
         None
         '''
-        with open('storeData.txt', 'r') as file:
-            # get the regular shape data without unnecessary characters
-            regLst = file.readline().translate(str.maketrans('', '', '[]\n')).split(', ')
-            irregLst = []
-            # get the irregular shape data as separate lists without unnecessary characters, each list represents one shape
-            line = file.readline()
-            while line != '\n':
-                irregLst.append(line.translate(str.maketrans('', '', '\n[]')).split(', '))
-                line = file.readline()
-            # create objects to assign the stored data to
-            for i in range(int(len(regLst)/2-1)):
-                self.regShape.append(RegShape())
-            for i in range(int(len(irregLst))):
-                self.irregShape.append(IrregShape())
-            # assigning data to newly created objects
-            for i in range(len(regLst)-2):
-                if i % 2 == 0: # assigning number of sides data
-                    self.regShape[int(i/2)].numOfSide = int(regLst[i])
-                elif i % 2 == 1: # assigning side length data
-                    self.regShape[math.floor(i/2)].side = float(regLst[i])
-            for i in range(len(irregLst)-1):
-                for j in range(len(irregLst[i])):
-                    if j % 2 == 0:
-                        # assining list of points to the newly created irregular shape object
-                        self.irregShape[i].points.append([float(irregLst[i][j]), float(irregLst[i][j+1])])
+        if self.loader == None: # every stored shape is loaded
+            return
+        chunk = next(self.loader, None)
+        if chunk == None:
+            self.loader = None
+            return
+        regLst = []
+        irregLst = []
+        for record in chunk:
+            if record[0] == 'reg':
+                regLst.append(RegShape(record[1], record[2]))
+            else:
+                shape = IrregShape()
+                # assining the points in world units to the newly created irregular shape object
+                shape.setCoords(record[1], record[2], record[3])
                 # set the number of sides
-                self.irregShape[i].numOfSide = int(len(irregLst[i])/2-1)
-                self.irregShape[i].oldShape = True
+                shape.numOfSide = shape.getNumOfPoint() - 1
+                shape.oldShape = True
+                irregLst.append(shape)
+        # draw the area of the loaded shapes again
+        for i in regLst + irregLst:
+            self.markDirty(i.getScreenRect(self.view))
+        self.regLayer.addShapes(regLst)
+        self.irregLayer.addShapes(irregLst)
+        # stored shapes go before the shapes drawn since the program was opened
+        self.regShape[self.numOfLoadedReg:self.numOfLoadedReg] = regLst
+        self.irregShape[self.numOfLoadedIrreg:self.numOfLoadedIrreg] = irregLst
+        self.numOfLoadedReg += len(regLst)
+        self.numOfLoadedIrreg += len(irregLst)
         
     def numOfSideInput(self, ev, i):
         '''
@@ -1143,7 +1835,7 @@ class Program:
                 self.userInGroup[i].txt = self.userInGroup[i].txt[:-1] # delete character
             else:
                 self.userInGroup[i].txt += ev.unicode # add the user input text
-            self.userInGroup[i].txtSurf = self.BIGFONT.render(self.userInGroup[i].txt, True, self.userInGroup[i].color)
+            self.userInGroup[i].txtSurf = textCache.render(self.BIGFONT, self.userInGroup[i].txt, self.userInGroup[i].color)
             
     def sideLengthInput(self, ev, i):
         '''
@@ -1182,7 +1874,7 @@ class Program:
                 self.userInGroup[i].txt = self.userInGroup[i].txt[:-1]
             else:
                 self.userInGroup[i].txt += ev.unicode
-            self.userInGroup[i].txtSurf = self.BIGFONT.render(self.userInGroup[i].txt, True, self.userInGroup[i].color)
+            self.userInGroup[i].txtSurf = textCache.render(self.BIGFONT, self.userInGroup[i].txt, self.userInGroup[i].color)
             
     def angleInput(self, ev):
         '''
@@ -1211,7 +1903,7 @@ class Program:
                 self.userInGroup[4].txt = self.userInGroup[4].txt[:-1]
             else:
                 self.userInGroup[4].txt += ev.unicode
-            self.userInGroup[4].txtSurf = self.BIGFONT.render(self.userInGroup[4].txt, True, self.userInGroup[4].color)
+            self.userInGroup[4].txtSurf = textCache.render(self.BIGFONT, self.userInGroup[4].txt, self.userInGroup[4].color)
             
     def areaPeriButtonPressed(self, func):
         '''
@@ -1288,12 +1980,22 @@ class Program:
         if self.buttonGroup[0].mouseCollide(): # if clear button is pressed
             if self.gameState == 2 or self.gameState == 3 or self.gameState == 4:
                 self.shouldDraw = False
+                self.markDirty()
+                self.regLayer.reset()
+                self.irregLayer.reset()
                 self.regShape = [RegShape()]
                 self.irregShape = [IrregShape()]
+                self.store.addClear()
+                # the stored shapes are cleared too, stop loading them
+                self.loader = None
+                self.numOfLoadedReg = 0
+                self.numOfLoadedIrreg = 0
             if self.gameState == 5:
                 self.mouseDraw.reset()
             elif self.gameState == 6:
                 self.microbitDraw.reset()
+                for stroke in self.microbitStrokes:
+                    stroke.lineCut()
         elif not self.showCoord and self.buttonGroup[3].mouseCollide(): # if show coordinate plane button is pressed
             self.showCoord = True
         elif self.showCoord and self.buttonGroup[4].mouseCollide(): # if hide coordinate plane button is pressed
@@ -1312,18 +2014,37 @@ class Program:
         None
         '''
         if self.showCoord: # if the coordinate plane is showing
+            # zoom around the origin, the shapes are transformed by the view when they are drawn
             if self.buttonGroup[8].mouseCollide(): # zoom in
-                self.coordPlane.scale /= 2 # rescale
-                for i in self.regShape: # rescale for regular shapes
-                    i.scale = self.coordPlane.scale
+                self.view.zoomAt(2, self.view.origin)
             elif self.buttonGroup[9].mouseCollide(): # zoom out
-                self.coordPlane.scale *= 2
-                for i in self.regShape: # rescale for regular shapes
-                    i.scale = self.coordPlane.scale
+                self.view.zoomAt(0.5, self.view.origin)
+                
+    def moveView(self, ev):
+        '''
+        This function zooms the coordinate plane around the mouse with the mouse wheel and
+        moves it while the right mouse button is held down
+
+        Parameters
+        ----------
+        ev: Event
+            the user event
+
+        Returns
+        -------
+        None
+        '''
+        if self.showCoord: # if the coordinate plane is showing
+            if ev.type == pg.MOUSEWHEEL:
+                mousePos = pg.mouse.get_pos()
+                if mousePos[0] < 700: # the mouse is over the coordinate plane
+                    self.view.zoomAt(WHEEL_ZOOM**ev.y, mousePos)
+            elif ev.type == pg.MOUSEMOTION and ev.buttons[2]:
+                self.view.pan(ev.rel)
            
     def event(self):
         '''
-        This function detects any user event
+        This function handles every user event in the queue, so bursts of events are handled in one frame
 
         Parameters
         ----------
@@ -1333,9 +2054,32 @@ class Program:
         -------
         None
         '''
-        ev = pg.event.poll() # Look for any event
+        events = pg.event.get()
+        if self.waitedEvent != None: # the event that ended the idle wait comes first
+            events.insert(0, self.waitedEvent)
+            self.waitedEvent = None
+        for ev in events:
+            self.handleEvent(ev)
+        if self.gameState == 6: # the microbit is read once per frame, not once per event
+            self.readMicrobit()
+            
+    def handleEvent(self, ev):
+        '''
+        This function handles one user event
+
+        Parameters
+        ----------
+        ev: Event
+            the user event
+
+        Returns
+        -------
+        None
+        '''
         if ev.type == pg.QUIT:  
             self.end = True
+        elif ev.type == pg.VIDEOEXPOSE or ev.type == pg.WINDOWEXPOSED: # the window needs to be drawn again
+            self.markDirty()
         if self.gameState == 0: # start screen
             if ev.type == pg.MOUSEBUTTONDOWN:
                 if self.buttonGroup[10].mouseCollide(): # start button pressed
@@ -1347,6 +2091,7 @@ class Program:
                 if self.buttonGroup[12].mouseCollide(): # back button pressed
                     self.gameState = -0.5
         elif self.gameState == 2: # main screen
+            self.moveView(ev)
             if ev.type == pg.MOUSEBUTTONDOWN:
                 # detects any button pressed
                 self.clrCoordButtonPressed()
@@ -1359,9 +2104,14 @@ class Program:
                     self.gameState = 5
                 elif self.buttonGroup[14].mouseCollide(): # draw with microbit
                     self.gameState = 6
+                    # the readers keep reading on the other screens, forget those tilts and start the lines again
+                    self.mb.readSamples()
+                    for stroke in self.microbitStrokes:
+                        stroke.lineCut()
                 elif self.buttonGroup[15].mouseCollide(): # back button
                     self.gameState = -0.5
         elif self.gameState == 3: # regular shapes
+            self.moveView(ev)
             if ev.type == pg.MOUSEBUTTONDOWN:
                 # detects any button pressed
                 self.clrCoordButtonPressed()
@@ -1375,6 +2125,7 @@ class Program:
                 self.numOfSideInput(ev, 0)
                 self.sideLengthInput(ev, 1)
         elif self.gameState == 4: # irregular shapes
+            self.moveView(ev)
             if ev.type == pg.MOUSEBUTTONDOWN:
                 # detect if any button pressed
                 self.clrCoordButtonPressed()
@@ -1402,7 +2153,7 @@ class Program:
                 self.backButtonPressed()
                 self.mouseDraw.drawing = True # start tracing
             elif ev.type == pg.MOUSEMOTION:
-                self.mouseDraw.moDraw() # tracing
+                self.mouseDraw.moDraw(ev.pos) # tracing
             elif ev.type == pg.MOUSEBUTTONUP:
                 self.mouseDraw.drawing = False # stop tracing and cuts the line
                 self.mouseDraw.lineCut()
@@ -1411,15 +2162,40 @@ class Program:
                 # detect if any button is pressed
                 self.clrCoordButtonPressed()
                 self.backButtonPressed()
-            if not self.mb.isReady(): # if microbit is not connected
+                
+    def readMicrobit(self):
+        '''
+        This function reads the tilts of every microbit since the last frame and draws with them,
+        each microbit draws its own line in its own color
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if not self.mb.isReady(): # if no microbit is connected
+            if self.displayMsg.txt != "No microbit detected." or self.displayMsg.fade == None:
                 self.displayMsg.txt = "No microbit detected."
                 self.displayMsg.txtChange()
-            elif self.mb.isReady(): # if microbit is connected
-                self.microbitDraw.drawing = True
-                line = self.mb.nonBlockingReadRecentLine()
-                if line != None:
-                    x, y = line.split() # get the x and y componenets of acceleration
-                    self.microbitDraw.microDraw(x, y)
+            else:
+                # keep the message fully visible while no microbit is connected, it fades out after one is
+                self.displayMsg.hold()
+        elif self.mb.isReady(): # if a microbit is connected
+            # take every sample read by the reader threads since the last frame, merged in time order
+            samples = self.mb.readSamples()
+            # split the samples by microbit, so every line is still drawn in one call
+            batches = {}
+            for index, sample in samples:
+                batches.setdefault(index, []).append(sample)
+            for index, batch in batches.items():
+                while len(self.microbitStrokes) <= index: # a microbit was plugged in
+                    color = STROKE_COLORS[len(self.microbitStrokes)%len(STROKE_COLORS)]
+                    self.microbitStrokes.append(HandDraw(color, self.microbitDraw.temSurface))
+                self.microbitStrokes[index].drawing = True
+                self.microbitStrokes[index].microDraw(batch)
                     
     def update(self):
         '''
@@ -1434,16 +2210,30 @@ class Program:
         None
         '''
         self.displayMsg.update() # update the display message
+        self.loadNextChunk() # keep loading the stored shapes
         if self.gameState == 3:
             for i in range(2):
                 self.userInGroup[i].update() # update the user input box if the input is too long
-            if self.regShape[-1].numOfSide != None and self.regShape[-1].side != None:
-                    self.regShape.append(RegShape()) # if the last regular shape is finished inputting, add a new shape to the list
+            if self.regShape[-1].isComplete():
+                self.markDirty(self.regShape[-1].getScreenRect(self.view))
+                self.regLayer.addShapes([self.regShape[-1]])
+                self.store.addReg(self.regShape[-1]) # save the finished shape right away
+                self.regShape.append(RegShape()) # if the last regular shape is finished inputting, add a new shape to the list
+                self.compactIfNeeded()
         elif self.gameState == 4:
             for i in range(2, 5):
                 self.userInGroup[i].update() # update the user input box if the input is too long
+            # add the new sides and close the shape in this frame, so no frame is needed without an event
+            changed = False
+            while self.irregShape[-1].step():
+                changed = True
+            if changed: # draw the area of the new sides again
+                self.markDirty(self.irregShape[-1].getScreenRect(self.view))
             if self.irregShape[-1].finishDrawing:
+                self.irregLayer.addShapes([self.irregShape[-1]])
+                self.store.addIrreg(self.irregShape[-1]) # save the finished shape right away
                 self.irregShape.append(IrregShape()) # if the last irregular shape is finished inputting, add a new shape to the list
+                self.compactIfNeeded()
         
     def drawMostUsedButtons(self):
         '''
@@ -1505,12 +2295,11 @@ class Program:
                 self.buttonGroup[i].draw(self.screen)
             for i in range(13, 16):
                 self.buttonGroup[i].draw(self.screen)
-            # draw regular and irregular shapes
+            # draw the finished regular and irregular shapes, then the irregular shape being inputted
             if self.shouldDraw:
-                for i in self.regShape:
-                    i.draw(self.screen)
-                for i in self.irregShape:
-                    i.draw(self.screen, self.coordPlane.scale)
+                self.regLayer.draw(self.screen, self.regShape, self.view)
+                self.irregLayer.draw(self.screen, self.irregShape, self.view)
+                self.irregShape[-1].draw(self.screen, self.view)
         elif self.gameState == 3: # regular shape
             # set up background
             self.screen.fill((255, 255, 255))
@@ -1518,10 +2307,9 @@ class Program:
             self.displayMsg.draw(self.screen, self.screenSize)
             # draw buttons
             self.drawMostUsedButtons()
-            # draw regular shapes
+            # draw the finished regular shapes, the one being inputted is only drawn when it is finished
             if self.shouldDraw:
-                for i in self.regShape:
-                    i.draw(self.screen)
+                self.regLayer.draw(self.screen, self.regShape, self.view)
             # draw user input boxes
             for i in range(2):
                 self.userInGroup[i].draw(self.screen)
@@ -1529,10 +2317,10 @@ class Program:
             self.screen.fill((255, 255, 255))
             self.displayMsg.draw(self.screen, self.screenSize)
             self.drawMostUsedButtons()
-            # draw irregular shapes
+            # draw the finished irregular shapes, then the one being inputted
             if self.shouldDraw:
-                for i in self.irregShape:
-                    i.draw(self.screen, self.coordPlane.scale)
+                self.irregLayer.draw(self.screen, self.irregShape, self.view)
+                self.irregShape[-1].draw(self.screen, self.view)
             # draw user input boxes
             if not self.irregShape[-1].startIrregInput:
                 self.userInGroup[2].draw(self.screen)
@@ -1550,7 +2338,8 @@ class Program:
             self.displayMsg.draw(self.screen, self.screenSize)
                 
 
-pg.init() # initialize the program
-program = Program() # create program object
-program.run() # run program
-pg.quit() # quit program
+if __name__ == '__main__':
+    pg.init() # initialize the program
+    program = Program() # create program object
+    program.run() # run program
+    pg.quit() # quit program
@@ -0,0 +1,663 @@
+#-----------------------------------------------------------------------------
+# Name:        Geometry (Geometry.py)
+# Purpose:     This module holds the geometry core of GeoApp. It keeps the regular
+#              and irregular shapes in world units, calculates the area, the
+#              perimeter and the orientation of a whole collection of shapes in one
+#              vectorized pass, and maps shapes onto the screen with any zoom and
+#              pan. It does not import pygame or the microbit code, so it can be
+#              used without a window.
+#
+# Author:      Nicole J
+# Created:     17-Oct-2026
+# Updated:     17-Oct-2026
+#-----------------------------------------------------------------------------
+
+import math
+from array import array
+from functools import lru_cache
+
+# numpy is imported inside the vectorized functions, so importing this module stays fast
+
+
+ORIGIN = (250, 275) # the screen position of the world origin
+PIXELS_PER_UNIT = 10 # the number of pixels of one world unit at scale 1
+OUTLINE_CACHE_SIZE = 256 # the number of regular shape outlines kept in the cache
+MIN_SCALE = 1e-12 # the zoom has no fixed steps, these limits only keep the floats meaningful
+MAX_SCALE = 1e12
+
+
+class ViewTransform:
+    """
+    A class used to represent the view that maps world units onto the screen
+    
+    """
+    def __init__(self, origin=ORIGIN, scale=1):
+        '''
+        This function initializes the screen position of the world origin and the scale of the view
+
+        Parameters
+        ----------
+        origin: tuple
+            the screen position of the world origin
+        scale: float
+            the number of world units shown by PIXELS_PER_UNIT pixels (bigger is zoomed out)
+
+        Returns
+        -------
+        None
+        '''
+        self.origin = origin
+        self.scale = scale
+        
+    def zoomAt(self, zoom, point):
+        '''
+        This function zooms the view by any factor while the world point under the given
+        screen point stays in place
+
+        Parameters
+        ----------
+        zoom: float
+            how much bigger the shapes become (less than 1 zooms out)
+        point: tuple
+            the screen position that stays in place
+
+        Returns
+        -------
+        None
+        '''
+        newScale = min(max(self.scale/zoom, MIN_SCALE), MAX_SCALE)
+        zoom = self.scale/newScale # the zoom that is left after the limits
+        self.scale = newScale
+        self.origin = (point[0] - (point[0] - self.origin[0])*zoom, point[1] - (point[1] - self.origin[1])*zoom)
+        
+    def pan(self, offset):
+        '''
+        This function moves the view by a screen offset
+
+        Parameters
+        ----------
+        offset: tuple
+            the number of pixels to move in x and in y
+
+        Returns
+        -------
+        None
+        '''
+        self.origin = (self.origin[0] + offset[0], self.origin[1] + offset[1])
+        
+    def getFactor(self):
+        '''
+        This function gets the number of pixels of one world unit in the current scale
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        float
+            the pixels per world unit
+        '''
+        return PIXELS_PER_UNIT/self.scale
+        
+    def toScreen(self, vertices):
+        '''
+        This function transforms world coordinates into screen coordinates in one vectorized step
+
+        Parameters
+        ----------
+        vertices: sequence
+            the world coordinates, see packShapes
+
+        Returns
+        -------
+        ndarray
+            an (n, 2) array of screen coordinates
+        '''
+        import numpy as np
+        factor = self.getFactor()
+        # the screen y-axis points down, so the y component is flipped
+        return np.asarray(vertices, dtype=np.float64).reshape(-1, 2)*(factor, -factor) + self.origin
+    
+    def toWorld(self, points):
+        '''
+        This function transforms screen coordinates back into world coordinates in one vectorized step
+
+        Parameters
+        ----------
+        points: sequence
+            the screen coordinates, see packShapes
+
+        Returns
+        -------
+        ndarray
+            an (n, 2) array of world coordinates
+        '''
+        import numpy as np
+        factor = 1/self.getFactor()
+        return (np.asarray(points, dtype=np.float64).reshape(-1, 2) - self.origin)*(factor, -factor)
+
+
+def regularVertices(numOfSide, side):
+    '''
+    This function calculates the vertexes of a regular shape in world units, starting at the origin
+    and walking the sides in the same order as the regular shape is drawn on screen
+
+    Parameters
+    ----------
+    numOfSide: integer
+        the number of sides of the regular shape
+    side: float
+        the side length of the regular shape
+
+    Returns
+    -------
+    vertices: ndarray
+        an (numOfSide, 2) array of the x and y coordinates of the vertexes
+    '''
+    import numpy as np
+    angles = np.arange(numOfSide)*(math.pi*2/numOfSide)
+    # the screen y-axis points down, so the y component is flipped to get world coordinates
+    steps = np.column_stack((side*np.sin(angles), -side*np.cos(angles)))
+    vertices = np.zeros((numOfSide, 2))
+    np.cumsum(steps[:-1], axis=0, out=vertices[1:])
+    return vertices
+
+
+def niceNumber(value):
+    '''
+    This function rounds a positive number to the closest "nice number", one, two or five
+    times a power of ten
+
+    Parameters
+    ----------
+    value: float
+        the number to round
+
+    Returns
+    -------
+    float
+        the nice number
+    '''
+    exponent = math.floor(math.log10(value))
+    fraction = value/10**exponent # between 1 and 10
+    if fraction < 1.5:
+        niceFraction = 1
+    elif fraction < 3:
+        niceFraction = 2
+    elif fraction < 7:
+        niceFraction = 5
+    else:
+        niceFraction = 10
+    return niceFraction*10.0**exponent
+
+
+def tickValues(low, high, step):
+    '''
+    This function calculates the ticks between two values, only the visible ticks are visited
+    so the cost does not depend on the zoom or on how far the view is from the origin
+
+    Parameters
+    ----------
+    low: float
+        the smallest visible value
+    high: float
+        the largest visible value
+    step: float
+        the distance between two ticks, see niceNumber
+
+    Returns
+    -------
+    list
+        the tick values, each one a whole multiple of step
+    '''
+    return [i*step for i in range(math.ceil(low/step), math.floor(high/step) + 1)]
+
+
+def tickLabel(value, step):
+    '''
+    This function formats the label of a tick with just enough digits to tell it apart from
+    the ticks next to it
+
+    Parameters
+    ----------
+    value: float
+        the tick value
+    step: float
+        the distance between two ticks
+
+    Returns
+    -------
+    String
+        the label
+    '''
+    exponent = math.floor(math.log10(step) + 1e-9) # the digit of the step
+    if abs(value) < step/2:
+        return '0'
+    magnitude = math.floor(math.log10(abs(value)))
+    if magnitude >= 6 or exponent <= -6: # very large or very small numbers are written in scientific notation
+        digits = min(max(magnitude - exponent, 0), 15)
+        return f'{value:.{digits}e}'
+    return f'{value:.{max(-exponent, 0)}f}'
+
+
+@lru_cache(maxsize=OUTLINE_CACHE_SIZE)
+def regularOutline(numOfSide, side, scale, origin=ORIGIN):
+    '''
+    This function gets the screen vertexes of a regular shape. The result is kept in a bounded
+    least recently used cache, so identical shapes share one outline and the sin / cos
+    are only calculated again when the shape or the zoom changes
+
+    Parameters
+    ----------
+    numOfSide: integer
+        the number of sides of the regular shape
+    side: float
+        the side length of the regular shape
+    scale: float
+        the scale of the view
+    origin: tuple
+        the screen position of the world origin
+
+    Returns
+    -------
+    tuple
+        the screen coordinates of the vertexes as (x, y) tuples, which must not be changed
+    '''
+    points = ViewTransform(origin, scale).toScreen(regularVertices(numOfSide, side))
+    return tuple(map(tuple, points.tolist()))
+
+
+def packShapes(shapes):
+    '''
+    This function packs a collection of ragged vertex lists into one flat vertex array
+
+    Parameters
+    ----------
+    shapes: iterable
+        each element is the vertexes of one shape, either as a list of [x, y] pairs
+        or as a flat sequence x0, y0, x1, y1, ...
+
+    Returns
+    -------
+    vertices: ndarray
+        an (n, 2) array with the vertexes of all shapes one after another
+    starts: ndarray
+        the index of the first vertex of every shape
+    counts: ndarray
+        the number of vertexes of every shape
+    '''
+    import numpy as np
+    blocks = [np.asarray(shape, dtype=np.float64).reshape(-1, 2) for shape in shapes]
+    counts = np.array([len(block) for block in blocks], dtype=np.intp)
+    starts = np.zeros(len(blocks), dtype=np.intp)
+    np.cumsum(counts[:-1], out=starts[1:])
+    if blocks:
+        vertices = np.concatenate(blocks)
+    else:
+        vertices = np.empty((0, 2))
+    return vertices, starts, counts
+
+
+def batchMetrics(shapes):
+    '''
+    This function calculates the area, the perimeter and the orientation of many shapes at once.
+    Every shape is treated as a closed ring, so the last vertex connects back to the first one
+    (repeating the start point at the end of the list is allowed and adds nothing).
+
+    Parameters
+    ----------
+    shapes: iterable
+        the vertexes of every shape, see packShapes
+
+    Returns
+    -------
+    areas: ndarray
+        the area of every shape
+    perimeters: ndarray
+        the perimeter of every shape
+    orientations: ndarray
+        1 if the vertexes go counterclockwise, -1 if they go clockwise and 0 if the shape has no area
+    '''
+    import numpy as np
+    vertices, starts, counts = packShapes(shapes)
+    numOfShape = len(counts)
+    owner = np.repeat(np.arange(numOfShape), counts) # the shape every vertex belongs to
+
+    # index of the next vertex along every ring, the last vertex wraps back to the first one
+    nxt = np.arange(1, len(vertices)+1)
+    hasVertex = counts > 0
+    nxt[(starts + counts - 1)[hasVertex]] = starts[hasVertex]
+
+    # move every shape to its own first vertex so the shoelace sums stay precise far from the origin
+    local = vertices - vertices[starts[owner]]
+    x = local[:, 0]
+    y = local[:, 1]
+    xNxt = x[nxt]
+    yNxt = y[nxt]
+
+    # shoelace theorem: https://artofproblemsolving.com/wiki/index.php/Shoelace_Theorem
+    signedAreas = np.bincount(owner, weights=x*yNxt - xNxt*y, minlength=numOfShape)/2
+    perimeters = np.bincount(owner, weights=np.hypot(xNxt - x, yNxt - y), minlength=numOfShape)
+    return np.abs(signedAreas), perimeters, np.sign(signedAreas).astype(np.int8)
+
+
+def shapeMetrics(vertices):
+    '''
+    This function calculates the area and the perimeter of a single shape with the batch kernel
+
+    Parameters
+    ----------
+    vertices: sequence
+        the vertexes of the shape, see packShapes
+
+    Returns
+    -------
+    area: float
+        the area of the shape
+    perimeter: float
+        the perimeter of the shape
+    '''
+    areas, perimeters, orientations = batchMetrics([vertices])
+    return float(areas[0]), float(perimeters[0])
+
+
+class RegPolygon:
+    """
+    A class used to represent the geometry of a regular shape
+    
+    """
+    __slots__ = ('numOfSide', 'side') # no instance dictionary, many shapes can be loaded at once
+    
+    def __init__(self, numOfSide=None, side=None):
+        '''
+        This function initializes the regular shape's number of sides and its side length
+
+        Parameters
+        ----------
+        numOfSide: integer
+            the number of sides, None until it is inputted
+        side: float
+            the side length, None until it is inputted
+
+        Returns
+        -------
+        None
+        '''
+        self.numOfSide = numOfSide
+        self.side = side # side length
+        
+    def isComplete(self):
+        '''
+        This function detects if both the number of sides and the side length are inputted
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Boolean
+            whether the regular shape can be drawn and calculated
+        '''
+        return self.numOfSide != None and self.side != None
+        
+    def getVertices(self):
+        '''
+        This function gets the vertexes of the regular shape in world units
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        ndarray
+            the x and y coordinates of the vertexes, starting at the origin
+        '''
+        return regularVertices(self.numOfSide, self.side)
+        
+    def getBounds(self):
+        '''
+        This function gets the bounding box of the regular shape in world units
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        tuple
+            the smallest x, the smallest y, the largest x and the largest y
+        '''
+        vertices = self.getVertices()
+        minX, minY = vertices.min(axis=0).tolist()
+        maxX, maxY = vertices.max(axis=0).tolist()
+        return minX, minY, maxX, maxY
+            
+    def getPerimeter(self):
+        '''
+        This function calculates the perimeter of the regular shape
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        roundedPer: float
+            the perimeter of the regular shape that is rounded to second decimal place
+        '''
+        if self.isComplete():
+            roundedPer = round(shapeMetrics(self.getVertices())[1], 2)
+            return roundedPer
+    
+    def getArea(self):
+        '''
+        This function calculates the area of the regular shape
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        roundedArea: float
+            the area of the regular shape that is rounded to second decimal place
+        '''
+        if self.isComplete():
+            roundedArea = round(shapeMetrics(self.getVertices())[0], 2)
+            return roundedArea
+        
+        
+class IrregPolygon:
+    """
+    A class used to represent the geometry of an irregular / customized shape
+    
+    """
+    __slots__ = ('startPos', 'coords', 'crossSum', 'edgeSum') # no instance dictionary, many shapes can be loaded at once
+    
+    def __init__(self):
+        '''
+        This function initializes the start point of the shape, its points positions
+        and the running sums of its area and perimeter
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.startPos = (0.0, 0.0) # the shape starts at the origin of the world
+        # points / vertexes in world units stored one after another (x0, y0, x1, y1, ...) in one
+        # contiguous buffer of doubles, they are never changed by zooming
+        self.coords = array('d', self.startPos)
+        
+        # running sums of the shape, updated every time a point is added
+        self.crossSum = 0.0 # sum of the shoelace terms, twice the signed area
+        self.edgeSum = 0.0 # sum of the side lengths
+        
+    def addPoint(self, point):
+        '''
+        This function adds a new point / vertex to the shape and updates the running
+        shoelace and side length sums, so the area and perimeter never need to walk all points again
+
+        Parameters
+        ----------
+        point: list
+            the world coordinate of the new point
+
+        Returns
+        -------
+        None
+        '''
+        prevX, prevY = self.coords[-2] - self.startPos[0], self.coords[-1] - self.startPos[1]
+        x, y = point[0] - self.startPos[0], point[1] - self.startPos[1]
+        # the closing term back to the starting point is always zero, so the sum is the area of the closed shape
+        self.crossSum += prevX*y - x*prevY
+        self.edgeSum += math.hypot(x - prevX, y - prevY)
+        self.coords.append(point[0])
+        self.coords.append(point[1])
+        
+    def addSide(self, side, angle=0):
+        '''
+        This function adds the next point of the shape from a side length and an angle
+
+        Parameters
+        ----------
+        side: float
+            the length of the new side
+        angle: float
+            the angle of the new side in degree, counterclockwise from the x-axis
+
+        Returns
+        -------
+        None
+        '''
+        nxtPos = (self.coords[-2] + side*math.cos(math.radians(angle)), self.coords[-1] + side*math.sin(math.radians(angle)))
+        self.addPoint(nxtPos)
+        
+    def close(self):
+        '''
+        This function connects the last point and the starting point as the last side
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.addPoint(self.startPos)
+        
+    def setCoords(self, coords, crossSum=None, edgeSum=None):
+        '''
+        This function replaces all points of a closed shape at once, for example with stored points.
+        The coordinates are not copied, so a read-only view into a file can be used as it is.
+
+        Parameters
+        ----------
+        coords: buffer
+            the world coordinates x0, y0, x1, y1, ... as an array('d') or a memoryview of doubles
+        crossSum: float
+            the stored shoelace sum, calculated with the batch kernel if it is None
+        edgeSum: float
+            the stored side length sum, calculated with the batch kernel if it is None
+
+        Returns
+        -------
+        None
+        '''
+        self.coords = coords
+        self.startPos = (coords[0], coords[1])
+        if crossSum == None or edgeSum == None:
+            areas, perimeters, orientations = batchMetrics([coords])
+            crossSum = float(areas[0]*orientations[0]*2)
+            edgeSum = float(perimeters[0])
+        self.crossSum = crossSum
+        self.edgeSum = edgeSum
+        
+    def getNumOfPoint(self):
+        '''
+        This function gets the number of points / vertexes added to the shape, including the start point
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        integer
+            the number of points
+        '''
+        return len(self.coords)//2
+        
+    def getVertices(self):
+        '''
+        This function gets the points of the shape in world units
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        ndarray
+            an (n, 2) copy of the x and y coordinates of the points
+        '''
+        import numpy as np
+        # copy the buffer, a view would stop the array from growing when the next point is added
+        return np.array(self.coords, dtype=np.float64).reshape(-1, 2)
+        
+    def getBounds(self):
+        '''
+        This function gets the bounding box of the shape in world units
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        tuple
+            the smallest x, the smallest y, the largest x and the largest y
+        '''
+        xs = self.coords[0::2]
+        ys = self.coords[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+     
+    def getPerimeter(self):
+        '''
+        This function gets the perimeter of the shape
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        roundedPer: float
+            the perimeter of the shape that is rounded to second decimal place
+        '''
+        roundedPer = round(self.edgeSum, 2)
+        return roundedPer
+    
+    def getArea(self):
+        '''
+        This function gets the area of the shape
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        roundedArea: float
+            the area of the shape that is rounded to second decimal place
+        '''
+        # shoelace theorem, the orientation of the points does not matter
+        roundedArea = round(abs(self.crossSum)/2, 2)
+        return roundedArea
@@ -1,24 +1,89 @@
 #-----------------------------------------------------------------------------
 # Name:        Microbit Class (Microbit.py)
-# Purpose:     This class detects a microbit and reads information from any active serial connections
+# Purpose:     This class detects a microbit and reads information from any active serial connections.
+#              A background reader thread can own the port, keep the newest samples in a
+#              ring buffer and reconnect with a backoff when the microbit is unplugged.
+#              AsyncMicrobit reads the microbit from an asyncio event loop instead.
+#              MicrobitGroup reads several microbits at once and merges their samples.
+#              pyserial is only imported when a microbit is looked for, see importSerial.
+#              Samples arrive as "x y" text lines or as packed binary frames, the
+#              format is detected from the data and binary frames are asked for.
 #
 # Author:      Mr. Brooks-Prenger
 # Created:     31-March-2021
-# Updated:     31-March-2021
+# Updated:     17-Oct-2026
 #-----------------------------------------------------------------------------
 
-import serial
-import serial.tools.list_ports as list_ports
+import heapq
+import os
+import struct
+import threading
 import time
+from collections import deque
+
+SAMPLE_BUFFER_SIZE = 4096 #number of samples kept, the oldest samples are dropped when the buffer is full
+MIN_BACKOFF = 0.5 #seconds to wait before the first reconnect attempt
+MAX_BACKOFF = 8 #longest wait between reconnect attempts
+
+#binary frame: sync byte, sequence number (counts up and wraps at 256), x, y, z, checksum
+#the checksum is the sum of the bytes between the sync byte and the checksum, modulo 256
+FRAME = struct.Struct('<BBhhhB')
+FRAME_SYNC = 0xA5 #never found in text, which is ASCII
+BINARY_REQUEST = b'BIN\r\n' #asks the microbit to send binary frames, text firmware ignores it
+LOCK_COUNT = 3 #number of valid frames / lines in a row needed to decide the format
+MAX_PENDING = 4096 #bytes kept while the format is not decided yet
+SCAN_INTERVAL = 2 #seconds between two searches for newly plugged in microbits
+MAX_SPREAD = 0.1 #longest time the samples of one read are spread over, a longer gap is idle time
+
+#pyserial, imported by importSerial the first time a microbit is looked for
+serial = None
+list_ports = None
+
+
+def importSerial():
+    '''
+    This function imports pyserial the first time it is needed, so programs that import this file
+    do not wait for it before they start
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    '''
+    global serial, list_ports
+    if serial == None:
+        import serial.tools.list_ports
+        list_ports = serial.tools.list_ports
 
 class Microbit():
     
-    def __init__(self):
+    def __init__(self, device=None):
         self.isLoaded = False
         self.dataCache = ''
+        self.device = device #name of the port, searched for by pid and vid if it is None
+        importSerial()
+        
+        #background reader, see startReader
+        self.reader = None
+        self.stopEvent = threading.Event()
+        self.samples = deque(maxlen=SAMPLE_BUFFER_SIZE) #ring buffer of (time, x, y, ...) samples
+        self.connected = False
+        self.droppedSamples = 0 #samples overwritten before they were read
+        self.decoder = SampleDecoder() #decodes text lines or binary frames, counts bad and lost samples
+        
+        #stats, see getStats
+        self.numOfSamples = 0 #samples read since the microbit was created
+        self.statsTime = time.monotonic()
+        self.statsCount = 0
+        self.latencyTotal = 0 #seconds samples waited in the ring buffer since the last getStats
+        self.numOfLatency = 0
+        self.maxLatency = 0
         
         print('looking for microbit')
-        self.microbit = self.findMicrobitComPort()
+        self.microbit = self.findMicrobitComPort(device=device)
         print(self.microbit)
         if not self.microbit:
             print('microbit not found')
@@ -57,6 +122,9 @@ class Microbit():
 
         
     def isReady(self):
+        if self.reader != None:
+            #the reader thread owns the port, don't touch it from here
+            return self.connected
         try:
             self.microbit.inWaiting()
             
@@ -72,13 +140,182 @@ class Microbit():
     
     def openConnection(self):
         self.microbit.open()
+        #drop what was sent before the port was opened, so the decoder starts at the start of a line
+        self.microbit.reset_input_buffer()
         #TODO - Add error handling here
         
     def closeConnection(self):
+        self.stopReader()
         self.microbit.close()
+        
+        
+    def startReader(self):
+        '''
+        This function starts a background thread that owns the serial port. It reads every line,
+        parses it into a timestamped sample and keeps it in a ring buffer. If the microbit is not
+        found or the connection is lost it keeps trying to reconnect, waiting longer after every failure
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.reader != None:
+            return
+        self.stopEvent.clear()
+        self.reader = threading.Thread(target=self.readerLoop, name='microbit reader', daemon=True)
+        self.reader.start()
+        
+        
+    def stopReader(self):
+        '''
+        This function stops the background reader thread and waits for it to finish
 
+        Parameters
+        ----------
+        None
 
-    def findMicrobitComPort(self, pid=516, vid=3368, baud=115200):
+        Returns
+        -------
+        None
+        '''
+        if self.reader == None:
+            return
+        self.stopEvent.set()
+        self.reader.join()
+        self.reader = None
+        self.connected = False
+        
+        
+    def readerLoop(self):
+        #runs on the reader thread, the render thread only uses readSamples / readRecentSample
+        backoff = MIN_BACKOFF
+        while not self.stopEvent.is_set():
+            try:
+                if self.microbit == None:
+                    self.microbit = self.findMicrobitComPort(device=self.device)
+                    if self.microbit == None:
+                        raise serial.SerialException('microbit not found')
+                if not self.microbit.is_open:
+                    self.openConnection()
+                #start decoding from scratch and ask for binary frames
+                self.decoder = SampleDecoder()
+                self.microbit.write(BINARY_REQUEST)
+                self.connected = True
+                backoff = MIN_BACKOFF
+                self.readLines()
+            except (serial.SerialException, OSError, ValueError):
+                self.connected = False
+                try:
+                    self.microbit.close()
+                except Exception:
+                    pass
+                #wait before trying again, stop right away if asked to
+                self.stopEvent.wait(backoff)
+                backoff = min(backoff*2, MAX_BACKOFF)
+        self.connected = False
+        
+        
+    def readLines(self):
+        #read until the connection fails or the reader is stopped
+        readTime = time.monotonic() #the bytes of a read arrived after the read before it ended
+        while not self.stopEvent.is_set():
+            #blocks for at most the port timeout
+            data = self.microbit.read(max(1, self.microbit.inWaiting()))
+            startTime = readTime
+            readTime = time.monotonic()
+            if not data:
+                continue
+            for sample in self.decoder.feed(data, readTime, startTime):
+                if len(self.samples) == self.samples.maxlen:
+                    self.droppedSamples += 1
+                self.samples.append(sample)
+                self.numOfSamples += 1
+        
+        
+    def readSamples(self):
+        '''
+        This function takes every sample out of the ring buffer
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list - Samples as (time, x, y, ...) tuples, oldest first
+        '''
+        samples = []
+        while self.samples:
+            samples.append(self.samples.popleft())
+        if samples:
+            #the oldest sample waited the longest
+            now = time.monotonic()
+            self.latencyTotal += now*len(samples) - sum(sample[0] for sample in samples)
+            self.numOfLatency += len(samples)
+            self.maxLatency = max(self.maxLatency, now - samples[0][0])
+        return samples
+    
+    
+    def readRecentSample(self):
+        '''
+        This function takes every sample out of the ring buffer and keeps only the newest one
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        tuple - The newest (time, x, y, ...) sample, or None if there is no new sample
+        '''
+        samples = self.readSamples()
+        if samples:
+            return samples[-1]
+        return None
+    
+    
+    def getStats(self):
+        '''
+        This function reports how fast samples arrive and how long they wait before they are read,
+        the rate and latency are measured since the last call
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict - device, connected, samples (total), rate (samples per second), latency and maxLatency
+               (seconds from reading a sample off the port to readSamples), dropped, lostFrames, badFrames, badLines
+        '''
+        now = time.monotonic()
+        count = self.numOfSamples
+        elapsed = now - self.statsTime
+        stats = {
+            'device': self.device,
+            'connected': self.connected,
+            'samples': count,
+            'rate': (count - self.statsCount)/elapsed if elapsed > 0 else 0,
+            'latency': self.latencyTotal/self.numOfLatency if self.numOfLatency else 0,
+            'maxLatency': self.maxLatency,
+            'dropped': self.droppedSamples,
+            'lostFrames': self.decoder.lostFrames,
+            'badFrames': self.decoder.badFrames,
+            'badLines': self.decoder.badLines,
+        }
+        self.statsTime = now
+        self.statsCount = count
+        self.latencyTotal = 0
+        self.numOfLatency = 0
+        self.maxLatency = 0
+        return stats
+
+
+    def findMicrobitComPort(self, pid=516, vid=3368, baud=115200, device=None):
         '''
         This function finds a device connected to usb by it's PID and VID and returns a serial connection
         Adapted From - https://stackoverflow.com/questions/58043143/how-to-set-up-serial-communication-with-microbit-using-pyserial
@@ -88,6 +325,7 @@ class Microbit():
         pid - Product id of device to search for
         vid - Vendor id of device to search for
         baud - Baud rate to open the serial connection at
+        device - Name of the port to use instead of searching
 
         Returns
         -------
@@ -98,29 +336,656 @@ class Microbit():
         #PID_MICROBIT = 516
         #VID_MICROBIT = 3368
         TIMEOUT = 0.1
+        importSerial()
+        
+        #Search for device on open ports and return connection if found
+        if device == None:
+            device = findMicrobitDevice(pid, vid)
+        if device == None:
+            #If nothing found then return None
+            return None
+        self.device = device
         
         #Create the serial object
         serPort = serial.Serial(timeout=TIMEOUT)
         serPort.baudrate = baud
-        
-        #Search for device on open ports and return connection if found
-        ports = list(list_ports.comports())
-        
+        serPort.port = device
+        return serPort
+
+
+def findMicrobitDevice(pid=516, vid=3368):
+    '''
+    This function finds a device connected to usb by it's PID and VID
+
+    Parameters
+    ----------
+    pid - Product id of device to search for
+    vid - Vendor id of device to search for
+
+    Returns
+    -------
+    String - The name of the port of the device (e.g. /dev/ttyACM0 or COM3), or None if it is not found
+
+    '''
+    devices = findMicrobitDevices(pid, vid)
+    if devices:
+        return devices[0]
+    return None
+
+
+def findMicrobitDevices(pid=516, vid=3368, verbose=True):
+    '''
+    This function finds every device connected to usb with the PID and VID
+
+    Parameters
+    ----------
+    pid - Product id of device to search for
+    vid - Vendor id of device to search for
+    verbose - Print the ports while scanning
+
+    Returns
+    -------
+    list - The names of the ports of the devices (e.g. /dev/ttyACM0 or COM3), in the order they were found
+
+    '''
+    #stand-in devices, such as MicrobitSimulator, can be used instead of searching,
+    #several are separated like paths (: on Linux and macOS, ; on Windows)
+    importSerial()
+    devices = os.environ.get('MICROBIT_DEVICE')
+    if devices:
+        if verbose:
+            print('using MICROBIT_DEVICE: {}'.format(devices))
+        return [device for device in devices.split(os.pathsep) if device]
+    
+    ports = list(list_ports.comports())
+    
+    devices = []
+    if verbose:
         print('scanning ports')
-        for p in ports:
+    for p in ports:
+        try:
+            found = (p.pid == pid) and (p.vid == vid)
+        except AttributeError:
+            continue
+        if verbose:
             print('port: {}'.format(p))
-            try:
-                print('pid: {} vid: {}'.format(p.pid, p.vid))
-            except AttributeError:
-                continue
-            if (p.pid == pid) and (p.vid == vid):
+            print('pid: {} vid: {}'.format(p.pid, p.vid))
+        if found:
+            if verbose:
                 print('found target device pid: {} vid: {} port: {}'.format(
                     p.pid, p.vid, p.device))
-                serPort.port = str(p.device)
-                return serPort
-        
-        #If nothing found then return None
+            devices.append(str(p.device))
+    return devices
+
+
+def parseSample(timestamp, line):
+    '''
+    This function parses one line of whitespace separated integers into a sample
+
+    Parameters
+    ----------
+    timestamp - Monotonic time the line was read at
+    line - Bytes of the line without the newline
+
+    Returns
+    -------
+    tuple - The (time, x, y, ...) sample, or None if the line could not be parsed
+    '''
+    try:
+        values = tuple(int(i) for i in line.decode('utf-8').split())
+    except (UnicodeDecodeError, ValueError):
         return None
+    if not values:
+        return None
+    return (timestamp,) + values
+
+
+def encodeFrame(sequence, x, y, z=0):
+    '''
+    This function packs one sample into a binary frame, the way the microbit sends it
+
+    Parameters
+    ----------
+    sequence - Number of the frame, only the lowest 8 bits are sent
+    x, y, z - Acceleration, -32768 to 32767
+
+    Returns
+    -------
+    bytes - The frame
+    '''
+    frame = bytearray(FRAME.pack(FRAME_SYNC, sequence & 0xFF, x, y, z, 0))
+    frame[-1] = sum(frame[1:-1]) & 0xFF
+    return bytes(frame)
+
+
+class SampleDecoder():
+    '''
+    Turns the bytes read from the microbit into samples. Until the format is known it looks for
+    LOCK_COUNT valid binary frames or text lines in a row. It goes back to looking when binary data
+    shows up in text mode or no valid frame is found in binary mode, so a microbit switching formats
+    or restarting is followed.
+    '''
+    
+    def __init__(self):
+        self.buffer = bytearray()
+        self.mode = 'auto' #'auto' while the format is not known, then 'text' or 'binary'
+        self.lastSequence = None
+        self.skipped = 0 #bytes skipped in binary mode since the last valid frame
+        self.lostFrames = 0 #frames missing from the sequence numbers
+        self.badFrames = 0 #frames with a wrong checksum
+        self.badLines = 0 #lines that could not be parsed
+        self.lastTime = None #time of the last call of feed
+        self.lineStart = True #if the buffer starts at the start of a line, otherwise its first line is cut off
+        
+        
+    def feed(self, data, timestamp, startTime=None):
+        '''
+        This function decodes the bytes read from the microbit. The samples of one read are spread evenly
+        between startTime and timestamp, so every sample gets its own time however the bytes are split into reads
+
+        Parameters
+        ----------
+        data - Bytes read from the port
+        timestamp - Monotonic time the bytes were read at
+        startTime - Monotonic time the bytes started arriving at, the timestamp of the last call if it is None
+
+        Returns
+        -------
+        list - The complete samples as (time, x, y, ...) tuples, a cut off sample is kept for the next call
+        '''
+        if startTime == None:
+            startTime = self.lastTime
+        self.lastTime = timestamp
+        self.buffer += data
+        samples = []
+        if self.mode == 'text' and not self.buffer.isascii():
+            self.mode = 'auto' #the microbit switched to binary frames
+        if self.mode == 'auto':
+            self.detect()
+        if self.mode == 'binary':
+            self.decodeFrames(timestamp, samples)
+        elif self.mode == 'text':
+            self.decodeLines(timestamp, samples)
+        if startTime != None and samples:
+            #the last sample is read at timestamp, the others one step apart before it
+            step = (timestamp - max(startTime, timestamp - MAX_SPREAD))/len(samples)
+            last = len(samples) - 1
+            samples = [(timestamp - (last - i)*step,) + sample[1:] for i, sample in enumerate(samples)]
+        return samples
+    
+    
+    def isFrame(self, i):
+        #check the sync byte and the checksum of the frame starting at i
+        return (self.buffer[i] == FRAME_SYNC and
+                sum(memoryview(self.buffer)[i+1:i+FRAME.size-1]) & 0xFF == self.buffer[i+FRAME.size-1])
+    
+    
+    def detect(self):
+        #binary frames always hold a sync byte, so text is only accepted from ASCII data
+        i = self.buffer.find(FRAME_SYNC)
+        while i != -1 and len(self.buffer) - i >= FRAME.size*LOCK_COUNT:
+            if all(self.isFrame(i + j*FRAME.size) for j in range(LOCK_COUNT)):
+                del self.buffer[:i]
+                self.lineStart = False
+                self.mode = 'binary'
+                self.lastSequence = None
+                return
+            i = self.buffer.find(FRAME_SYNC, i + 1)
+        if i == -1:
+            lines = self.buffer.split(b'\n')[:-1]
+            #a cut off first line is not counted
+            numOfLine = len(lines) if self.lineStart else len(lines) - 1
+            if numOfLine >= LOCK_COUNT and all(parseSample(0, line) != None for line in lines[-LOCK_COUNT:]):
+                if not self.lineStart:
+                    del self.buffer[:self.buffer.index(b'\n') + 1]
+                    self.lineStart = True
+                self.mode = 'text'
+                return
+        if len(self.buffer) > MAX_PENDING:
+            del self.buffer[:len(self.buffer) - MAX_PENDING]
+            self.lineStart = False
+            
+            
+    def decodeFrames(self, timestamp, samples):
+        #unpack the frames straight from the buffer, skipping to the next sync byte after a bad frame
+        view = memoryview(self.buffer)
+        i = 0
+        frameEnd = 0 #end of the last valid frame
+        while len(self.buffer) - i >= FRAME.size:
+            #fast path, unpack every whole frame at once until one is not valid
+            for sync, sequence, x, y, z, checksum in FRAME.iter_unpack(view[i:i + (len(self.buffer) - i)//FRAME.size*FRAME.size]):
+                if sync != FRAME_SYNC or (sequence + (x & 0xFF) + ((x >> 8) & 0xFF) + (y & 0xFF) + ((y >> 8) & 0xFF)
+                                          + (z & 0xFF) + ((z >> 8) & 0xFF)) & 0xFF != checksum:
+                    break
+                if self.lastSequence != None:
+                    self.lostFrames += (sequence - self.lastSequence - 1) & 0xFF
+                self.lastSequence = sequence
+                samples.append((timestamp, x, y, z))
+                i += FRAME.size
+                frameEnd = i
+                self.skipped = 0
+            if len(self.buffer) - i < FRAME.size:
+                break
+            if self.isFrame(i):
+                sync, sequence, x, y, z, checksum = FRAME.unpack_from(view, i)
+                if self.lastSequence != None:
+                    self.lostFrames += (sequence - self.lastSequence - 1) & 0xFF
+                self.lastSequence = sequence
+                samples.append((timestamp, x, y, z))
+                i += FRAME.size
+                frameEnd = i
+                self.skipped = 0
+                continue
+            if self.buffer[i] == FRAME_SYNC:
+                self.badFrames += 1
+            j = self.buffer.find(FRAME_SYNC, i + 1)
+            j = len(self.buffer) if j == -1 else j
+            self.skipped += j - i
+            i = j
+            if self.skipped >= FRAME.size*LOCK_COUNT: #no frames anymore, the microbit switched to text
+                #look for text in everything after the last frame
+                view.release()
+                del self.buffer[:frameEnd]
+                self.lineStart = True #the microbit starts its first line after its last frame
+                self.mode = 'auto'
+                self.skipped = 0
+                self.detect()
+                if self.mode == 'text':
+                    self.decodeLines(timestamp, samples)
+                return
+        view.release()
+        del self.buffer[:i]
+        
+        
+    def decodeLines(self, timestamp, samples):
+        lines = self.buffer.split(b'\n')
+        self.buffer = lines.pop() #keep the cut off data for later
+        for line in lines:
+            sample = parseSample(timestamp, line)
+            if sample == None:
+                self.badLines += 1
+            else:
+                samples.append(sample)
+
+
+class AsyncMicrobit():
+    '''
+    Reads a microbit from an asyncio event loop. The port is opened non-blocking and the event loop
+    calls back when it has data, so no thread or polling is needed and the microbit can share the loop
+    with other async I/O. The reader callbacks need a selector event loop (POSIX).
+    
+    Example:
+        async with AsyncMicrobit() as mb:
+            async for sample in mb:
+                print(sample) #(time, x, y)
+    '''
+    
+    def __init__(self, device=None, pid=516, vid=3368, baud=115200):
+        '''
+        This function sets up the microbit, it is connected by connect or on the first sample
+
+        Parameters
+        ----------
+        device - Name of the port, it is searched for by pid and vid if it is None
+        pid - Product id of device to search for
+        vid - Vendor id of device to search for
+        baud - Baud rate to open the serial connection at
+
+        Returns
+        -------
+        None
+        '''
+        self.device = device
+        self.searchDevice = device == None #search again after the microbit is unplugged
+        importSerial()
+        self.pid = pid
+        self.vid = vid
+        self.baud = baud
+        
+        self.port = None
+        self.loop = None
+        self.decoder = SampleDecoder() #decodes text lines or binary frames, counts bad and lost samples
+        self.samples = deque(maxlen=SAMPLE_BUFFER_SIZE) #ring buffer of (time, x, y, ...) samples
+        self.dataReady = None #set when there are samples or the connection is lost
+        self.connected = False
+        self.closed = False
+        self.droppedSamples = 0 #samples overwritten before they were read
+        
+        
+    async def connect(self):
+        '''
+        This function opens the port non-blocking and registers it with the event loop
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None - Raises serial.SerialException if the microbit is not found or cannot be opened
+        '''
+        import asyncio #only needed by AsyncMicrobit, importing it would slow down every program using this file
+        self.loop = asyncio.get_running_loop()
+        if self.dataReady == None:
+            self.dataReady = asyncio.Event()
+        if self.searchDevice:
+            #listing the ports blocks, so it runs on a worker thread instead of the event loop
+            devices = await self.loop.run_in_executor(None, findMicrobitDevices, self.pid, self.vid, False)
+            if not devices:
+                raise serial.SerialException('microbit not found')
+            self.device = devices[0]
+        #timeout=0 makes every read return right away
+        self.port = serial.Serial(self.device, self.baud, timeout=0, write_timeout=0)
+        #drop what was sent before the port was opened, so the decoder starts at the start of a line
+        self.port.reset_input_buffer()
+        #start decoding from scratch and ask for binary frames
+        self.decoder = SampleDecoder()
+        self.port.write(BINARY_REQUEST)
+        self.loop.add_reader(self.port.fileno(), self.onReadable)
+        self.connected = True
+        
+        
+    async def reconnect(self):
+        '''
+        This function keeps trying to connect, waiting longer after every failure
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        import asyncio
+        backoff = MIN_BACKOFF
+        while not self.closed:
+            try:
+                await self.connect()
+                return
+            except (serial.SerialException, OSError):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff*2, MAX_BACKOFF)
+                
+                
+    def onReadable(self):
+        #called by the event loop when the port has data
+        try:
+            data = os.read(self.port.fileno(), 4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data: #the microbit was unplugged
+            self.disconnect()
+            return
+        for sample in self.decoder.feed(data, time.monotonic()):
+            if len(self.samples) == self.samples.maxlen:
+                self.droppedSamples += 1
+            self.samples.append(sample)
+        if self.samples:
+            self.dataReady.set()
+            
+            
+    def disconnect(self):
+        #stop listening to the port and close it
+        if self.port != None:
+            try:
+                self.loop.remove_reader(self.port.fileno())
+            except (ValueError, OSError):
+                pass
+            self.port.close()
+            self.port = None
+        self.connected = False
+        if self.dataReady != None:
+            self.dataReady.set() #wake up the iterator so it reconnects
+            
+            
+    def readSamples(self):
+        '''
+        This function takes every sample out of the ring buffer without waiting
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list - Samples as (time, x, y, ...) tuples, oldest first
+        '''
+        samples = list(self.samples)
+        self.samples.clear()
+        return samples
+    
+    
+    def __aiter__(self):
+        return self
+    
+    
+    async def __anext__(self):
+        #wait for the next sample, reconnecting with backoff when the microbit is unplugged
+        while not self.samples:
+            if self.closed:
+                raise StopAsyncIteration
+            if not self.connected:
+                await self.reconnect()
+                continue
+            self.dataReady.clear()
+            await self.dataReady.wait()
+        return self.samples.popleft()
+    
+    
+    async def __aenter__(self):
+        await self.reconnect()
+        return self
+    
+    
+    async def __aexit__(self, *exc):
+        self.close()
+        
+        
+    def close(self):
+        '''
+        This function closes the port and ends the sample iterator
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.closed = True
+        self.disconnect()
+
+        
+
+class MicrobitGroup():
+    '''
+    Reads several microbits at once, such as a class drawing together. Every microbit has its own
+    Microbit and reader thread, so a slow or unplugged microbit does not hold up the others, and the
+    render loop only takes the samples that are already read. A discovery thread keeps looking for
+    newly plugged in microbits. Microbits are numbered in the order they are found and keep their number
+    when they are unplugged, their reader reconnects them.
+    
+    Example:
+        group = MicrobitGroup()
+        group.startReaders()
+        for index, sample in group.readSamples():
+            print(index, sample) #0, (time, x, y)
+    '''
+    
+    def __init__(self, pid=516, vid=3368):
+        self.pid = pid
+        self.vid = vid
+        self.microbits = [] #in the order they were found, the index is the microbit's number
+        self.lock = threading.Lock() #guards microbits, the discovery thread adds to it
+        self.scanner = None
+        self.stopEvent = threading.Event()
+        
+        
+    def scan(self, verbose=False):
+        '''
+        This function opens every microbit that is plugged in and not opened yet
+
+        Parameters
+        ----------
+        verbose - Print the ports while scanning
+
+        Returns
+        -------
+        int - Number of microbits added
+        '''
+        known = {mb.device for mb in self.microbits}
+        added = 0
+        for device in findMicrobitDevices(self.pid, self.vid, verbose):
+            if device in known:
+                continue
+            try:
+                mb = Microbit(device)
+            except (serial.SerialException, OSError):
+                #busy or gone again, try on the next scan
+                continue
+            if self.scanner != None:
+                mb.startReader()
+            with self.lock:
+                self.microbits.append(mb)
+            added += 1
+        return added
+    
+    
+    def startReaders(self):
+        '''
+        This function starts a reader thread for every microbit and a discovery thread that adds
+        microbits plugged in later
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.scanner != None:
+            return
+        self.stopEvent.clear()
+        self.scanner = threading.Thread(target=self.scanLoop, name='microbit discovery', daemon=True)
+        for mb in self.getMicrobits():
+            mb.startReader()
+        self.scanner.start()
+        
+        
+    def scanLoop(self):
+        #runs on the discovery thread, only the first scan prints the ports
+        verbose = True
+        while not self.stopEvent.is_set():
+            try:
+                self.scan(verbose)
+            except Exception:
+                #listing the ports failed, try again later
+                pass
+            verbose = False
+            self.stopEvent.wait(SCAN_INTERVAL)
+            
+            
+    def stopReaders(self):
+        '''
+        This function stops the discovery thread and every reader thread
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.scanner != None:
+            self.stopEvent.set()
+            self.scanner.join()
+            self.scanner = None
+        for mb in self.getMicrobits():
+            mb.stopReader()
+            
+            
+    def close(self):
+        '''
+        This function stops reading and closes every microbit
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.stopReaders()
+        for mb in self.getMicrobits():
+            if mb.microbit != None:
+                mb.closeConnection()
+        
+        
+    def getMicrobits(self):
+        '''
+        This function gets the microbits found so far
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list - The Microbits, a copy so the discovery thread can keep adding
+        '''
+        with self.lock:
+            return list(self.microbits)
+        
+        
+    def isReady(self):
+        #ready if any microbit is connected
+        return any(mb.isReady() for mb in self.getMicrobits())
+    
+    
+    def readSamples(self):
+        '''
+        This function takes every sample out of the ring buffer of every microbit and merges them by time
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list - (index, sample) pairs oldest first, index is the number of the microbit and
+               sample is its (time, x, y, ...) tuple
+        '''
+        streams = []
+        for index, mb in enumerate(self.getMicrobits()):
+            samples = mb.readSamples()
+            if samples:
+                streams.append([(index, sample) for sample in samples])
+        if len(streams) == 1:
+            return streams[0]
+        #every stream is already in time order, so merging takes n log(number of microbits)
+        return list(heapq.merge(*streams, key=lambda item: item[1][0]))
+    
+    
+    def getStats(self):
+        '''
+        This function reports the throughput and latency of every microbit, see Microbit.getStats
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list - The stats of every microbit, in the order of their numbers
+        '''
+        return [mb.getStats() for mb in self.getMicrobits()]
 
 
 
@@ -0,0 +1,263 @@
+#-----------------------------------------------------------------------------
+# Name:        Microbit Simulator (MicrobitSimulator.py)
+# Purpose:     This file stands in for a microbit on Linux. It opens a pseudo-terminal
+#              that speaks the same "x y\r\n" protocol as the microbit, or its binary
+#              frames, and replays a recorded or a synthetic accelerometer trace at a
+#              chosen rate, so the microbit drawing can be tried and load tested
+#              without a device.
+#              Run "python MicrobitSimulator.py --rate 1000", then start GeoApp with
+#              MICROBIT_DEVICE set to the printed device.
+#
+# Author:      Nicole J
+# Created:     17-Oct-2026
+# Updated:     17-Oct-2026
+#-----------------------------------------------------------------------------
+
+import argparse
+import math
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from Microbit import BINARY_REQUEST, encodeFrame
+
+
+TICK = 0.001 # the number of seconds between two writes, the samples due in between are written together
+
+
+def syntheticTrace(numOfSample=1000, amplitude=400, period=200):
+    '''
+    This function creates a trace of a microbit tilted around in a circle
+
+    Parameters
+    ----------
+    numOfSample: integer
+        the number of samples in the trace
+    amplitude: integer
+        the largest acceleration, the microbit sends about -1024 to 1024
+    period: integer
+        the number of samples of one circle
+
+    Returns
+    -------
+    list
+        the (x, y) samples
+    '''
+    trace = []
+    for i in range(numOfSample):
+        angle = i*2*math.pi/period
+        trace.append((round(amplitude*math.cos(angle)), round(amplitude*math.sin(angle))))
+    return trace
+
+
+def readTrace(fileName):
+    '''
+    This function reads a recorded trace, one "x y" line per sample like the microbit sends them
+
+    Parameters
+    ----------
+    fileName: String
+        the name of the trace file
+
+    Returns
+    -------
+    list
+        the (x, y) samples, lines that are not two integers are skipped
+    '''
+    trace = []
+    with open(fileName) as file:
+        for line in file:
+            values = line.split()
+            if len(values) == 2 and all(i.lstrip('-').isdigit() for i in values):
+                trace.append((int(values[0]), int(values[1])))
+    return trace
+
+
+class MicrobitSimulator:
+    """
+    A class used to represent a microbit replaying a trace on a pseudo-terminal
+
+    """
+    def __init__(self):
+        '''
+        This function opens the pseudo-terminal, the device can be opened like the port of a microbit
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave) # no echo and no line editing, the bytes are passed on as they are
+        self.device = os.ttyname(self.slave)
+
+        self.writer = None
+        self.stopEvent = threading.Event()
+        self.numOfSent = 0 # the number of samples written so far
+        self.binary = False # if the samples are sent as binary frames
+
+    def start(self, trace, rate=100, loop=False, protocol='auto'):
+        '''
+        This function starts replaying a trace on a background thread
+
+        Parameters
+        ----------
+        trace: list
+            the (x, y) samples
+        rate: float
+            the number of samples per second, up to tens of thousands
+        loop: Boolean
+            if the trace starts again after its last sample
+        protocol: String
+            'text' for "x y" lines, 'binary' for binary frames, or 'auto' to send text until
+            the reader asks for binary frames, like a microbit running the binary firmware
+
+        Returns
+        -------
+        None
+        '''
+        self.stop()
+        self.stopEvent.clear()
+        self.protocol = protocol
+        self.binary = protocol == 'binary'
+        self.writer = threading.Thread(target=self.replay, args=(trace, rate, loop), name='microbit simulator', daemon=True)
+        self.writer.start()
+
+    def replay(self, trace, rate, loop):
+        '''
+        This function writes the samples of a trace when they are due
+
+        Parameters
+        ----------
+        trace: list
+            the (x, y) samples
+        rate: float
+            the number of samples per second
+        loop: Boolean
+            if the trace starts again after its last sample
+
+        Returns
+        -------
+        None
+        '''
+        lines = [f'{x} {y}\r\n'.encode() for x, y in trace]
+        startTime = time.monotonic()
+        i = 0 # the index of the next sample in the trace
+        sent = 0 # the number of samples written in this replay, numOfSent also counts earlier replays
+        request = b'' # the bytes written by the reader
+        while not self.stopEvent.is_set() and lines:
+            if self.protocol == 'auto' and not self.binary and select.select([self.master], [], [], 0)[0]:
+                request = (request + os.read(self.master, 64))[-len(BINARY_REQUEST):]
+                self.binary = request == BINARY_REQUEST
+            due = int((time.monotonic() - startTime)*rate) - sent
+            if due > 0:
+                batch = []
+                for j in range(due):
+                    if i == len(lines):
+                        if not loop:
+                            break
+                        i = 0
+                    if self.binary:
+                        batch.append(encodeFrame(self.numOfSent + len(batch), *trace[i]))
+                    else:
+                        batch.append(lines[i])
+                    i += 1
+                if not batch:
+                    return
+                try:
+                    os.write(self.master, b''.join(batch))
+                except OSError: # the pseudo-terminal is closed
+                    return
+                sent += len(batch)
+                self.numOfSent += len(batch)
+            self.stopEvent.wait(TICK)
+
+    def isRunning(self):
+        '''
+        This function detects if the trace is still being replayed
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Boolean
+            whether the replay thread is running
+        '''
+        return self.writer != None and self.writer.is_alive()
+
+    def stop(self):
+        '''
+        This function stops replaying the trace
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.writer != None:
+            self.stopEvent.set()
+            self.writer.join()
+            self.writer = None
+
+    def close(self):
+        '''
+        This function stops replaying and closes the pseudo-terminal, a reader sees it as an unplugged microbit
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.stop()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def main():
+    '''
+    This function replays a trace until it is stopped with Ctrl+C
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    None
+    '''
+    parser = argparse.ArgumentParser(description='Replay an accelerometer trace on a pseudo-terminal.')
+    parser.add_argument('--trace', help='a recorded trace with one "x y" line per sample, a circle is used if it is not given')
+    parser.add_argument('--rate', type=float, default=100, help='samples per second (default 100)')
+    parser.add_argument('--once', action='store_true', help='stop after the last sample instead of looping')
+    parser.add_argument('--protocol', choices=('auto', 'text', 'binary'), default='auto',
+                        help='text lines, binary frames, or text until binary frames are asked for (default auto)')
+    args = parser.parse_args()
+
+    trace = readTrace(args.trace) if args.trace else syntheticTrace()
+    simulator = MicrobitSimulator()
+    print(f'microbit simulator on {simulator.device}, start GeoApp with MICROBIT_DEVICE={simulator.device}')
+    simulator.start(trace, args.rate, not args.once, args.protocol)
+    try:
+        while simulator.isRunning():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    print(f'{simulator.numOfSent} samples sent')
+    simulator.close()
+
+
+if __name__ == '__main__':
+    main()
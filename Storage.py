@@ -0,0 +1,915 @@
+#-----------------------------------------------------------------------------
+# Name:        Storage (Storage.py)
+# Purpose:     This module reads and writes the shapes stored by GeoApp. Shapes are
+#              saved in a versioned binary file that is memory-mapped when it is
+#              opened, so the vertexes are used straight from the file without
+#              copying. Every finished shape and every clear is appended to a journal
+#              right away, and the journal is compacted into a new binary file from
+#              time to time. Shapes can also be kept in an SQLite database instead,
+#              which can load only the shapes in a viewport or with a certain area.
+#              The older text save file is decoded lazily in fixed-size
+#              blocks. All files are read one shape at a time, so the program can
+#              start drawing before every shape is loaded.
+#
+# Author:      Nicole J
+# Created:     17-Oct-2026
+# Updated:     17-Oct-2026
+#-----------------------------------------------------------------------------
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from itertools import chain, islice
+from Geometry import ORIGIN, PIXELS_PER_UNIT, shapeMetrics
+
+
+BLOCK_SIZE = 2**16 # the number of characters read from the file at a time
+CHUNK_SIZE = 256 # the number of shapes loaded at a time
+COMPACT_SIZE = 2**20 # the journal is not compacted before it reaches this number of bytes
+
+TEXT_FILE = 'storeData.txt' # the older text save file
+BINARY_FILE = 'storeData.bin' # the binary save file (snapshot)
+JOURNAL_FILE = 'storeData.journal' # the changes since the binary save file was written
+DATABASE_FILE = 'storeData.db' # the optional SQLite database
+
+# binary file layout (little-endian):
+#   header: magic, version, number of shapes, generation (the number of compactions so far)
+#   index: one entry per shape with its kind, its number of sides / points, its side length,
+#          the byte offset of its vertex block and its shoelace and side length sums
+#   vertex blocks: the points of every irregular shape as packed float64 x0, y0, x1, y1, ... in world units
+MAGIC = b'GEOA'
+VERSION = 2
+HEADERS = {1: struct.Struct('<4sHxxQ'), 2: struct.Struct('<4sHxxQQ')} # the header of every version
+HEADER = HEADERS[VERSION]
+INDEX_ENTRY = struct.Struct('<BxxxIdQdd')
+REG_KIND = 0
+IRREG_KIND = 1
+CLEAR_KIND = 2
+
+# journal file layout (little-endian):
+#   header: magic, version, generation of the binary file the journal continues
+#   records: kind, number of sides / points, side length, shoelace and side length sums,
+#            followed by the packed float64 points for an irregular shape
+JOURNAL_MAGIC = b'GEOJ'
+JOURNAL_VERSION = 1
+JOURNAL_HEADER = struct.Struct('<4sHxxQ')
+JOURNAL_ENTRY = struct.Struct('<BxxxIddd')
+
+TOKEN = re.compile(r'[^\s,\[\]]+|\n') # a number, None or the end of a line
+LAST_TOKEN = re.compile(r'[^\s,\[\]]*$') # the token at the end of a block, it may continue in the next block
+
+
+def iterTokens(file, blockSize=BLOCK_SIZE):
+    '''
+    This function reads the text file block by block and splits it into tokens
+
+    Parameters
+    ----------
+    file: file object
+        the opened text file
+    blockSize: integer
+        the number of characters read at a time
+
+    Returns
+    -------
+    generator
+        yields every number / None in the file as a string, and '\n' at the end of every line
+    '''
+    leftover = ''
+    while True:
+        block = file.read(blockSize)
+        if not block:
+            break
+        text = leftover + block
+        # keep a number cut in half by the end of the block for the next block
+        cut = LAST_TOKEN.search(text).start()
+        for match in TOKEN.finditer(text, 0, cut):
+            yield match.group()
+        leftover = text[cut:]
+    if leftover:
+        yield leftover
+
+
+def iterTextRecords(fileName=TEXT_FILE, blockSize=BLOCK_SIZE):
+    '''
+    This function decodes the shapes in a text save file one at a time. The first line holds the
+    number of sides and the side length of every regular shape, every following line holds the
+    points of one irregular shape in the screen coordinates of the default view, and an empty line
+    ends the file. The shapes that were still being inputted when the file was saved are skipped.
+
+    Parameters
+    ----------
+    fileName: String
+        the name of the save file
+    blockSize: integer
+        the number of characters read at a time
+
+    Returns
+    -------
+    generator
+        yields ('reg', numOfSide, side) for a regular shape and ('irreg', coords, None, None) for an
+        irregular shape, where coords is an array('d') of world coordinates x0, y0, x1, y1, ...
+    '''
+    with open(fileName, 'r') as file:
+        tokens = iterTokens(file, blockSize)
+        # regular shapes, the one still being inputted has None as its values
+        pair = []
+        for token in tokens:
+            if token == '\n':
+                break
+            pair.append(token)
+            if len(pair) == 2:
+                if 'None' not in pair:
+                    yield ('reg', int(pair[0]), float(pair[1]))
+                pair = []
+        # irregular shapes, the last line is the shape that was still being drawn
+        coords = array('d')
+        prevCoords = None
+        for token in tokens:
+            if token != '\n':
+                # convert the screen coordinate to world units, the screen y-axis points down
+                if len(coords) % 2 == 0:
+                    coords.append((float(token) - ORIGIN[0])/PIXELS_PER_UNIT)
+                else:
+                    coords.append((ORIGIN[1] - float(token))/PIXELS_PER_UNIT)
+            elif not coords: # empty line
+                break
+            else:
+                if prevCoords != None:
+                    yield ('irreg', prevCoords, None, None)
+                prevCoords = coords
+                coords = array('d')
+
+
+def writeBinary(regShapes, irregShapes, generation=0, fileName=BINARY_FILE):
+    '''
+    This function writes the shapes into a binary save file. The file is written under a temporary
+    name first and then renamed, so a crash while saving never leaves a broken save file behind.
+
+    Parameters
+    ----------
+    regShapes: list
+        the regular shapes (RegPolygon) to store
+    irregShapes: list
+        the irregular shapes (IrregPolygon) to store
+    generation: integer
+        the number of compactions so far, it tells which journal belongs to the file
+    fileName: String
+        the name of the save file
+
+    Returns
+    -------
+    integer
+        the size of the file in bytes
+    '''
+    entries = []
+    blocks = []
+    offset = HEADER.size + INDEX_ENTRY.size*(len(regShapes) + len(irregShapes))
+    for shape in regShapes:
+        entries.append(INDEX_ENTRY.pack(REG_KIND, shape.numOfSide, shape.side, 0, 0.0, 0.0))
+    for shape in irregShapes:
+        coords = shape.coords
+        if sys.byteorder != 'little': # the file is always little-endian
+            coords = array('d', coords)
+            coords.byteswap()
+        entries.append(INDEX_ENTRY.pack(IRREG_KIND, len(coords)//2, 0.0, offset, shape.crossSum, shape.edgeSum))
+        blocks.append(coords)
+        offset += len(coords)*8
+    tmpName = fileName + '.tmp'
+    with open(tmpName, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(entries), generation))
+        file.write(b''.join(entries))
+        for block in blocks:
+            file.write(block)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmpName, fileName)
+    return offset
+
+
+def openBinary(fileName=BINARY_FILE):
+    '''
+    This function memory-maps a binary save file and checks its header
+
+    Parameters
+    ----------
+    fileName: String
+        the name of the save file
+
+    Returns
+    -------
+    mmap
+        the read-only mapped file, it must stay open while the shapes use its vertexes
+    '''
+    with open(fileName, 'rb') as file:
+        mappedFile = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mappedFile.size() < HEADERS[1].size or mappedFile[:4] != MAGIC:
+        mappedFile.close()
+        raise ValueError(f'{fileName} is not a GeoApp save file')
+    version = HEADERS[1].unpack_from(mappedFile, 0)[1]
+    if version not in HEADERS:
+        mappedFile.close()
+        raise ValueError(f'{fileName} has version {version}, only versions up to {VERSION} can be read')
+    if mappedFile.size() < HEADERS[version].size:
+        mappedFile.close()
+        raise ValueError(f'{fileName} is cut off inside its header')
+    numOfShape, generation, headerSize = readHeader(mappedFile)
+    if mappedFile.size() < headerSize + INDEX_ENTRY.size*numOfShape:
+        mappedFile.close()
+        raise ValueError(f'{fileName} is cut off inside its index')
+    return mappedFile
+
+
+def readHeader(mappedFile):
+    '''
+    This function reads the header of a mapped binary save file
+
+    Parameters
+    ----------
+    mappedFile: mmap
+        the mapped file from openBinary
+
+    Returns
+    -------
+    numOfShape: integer
+        the number of shapes in the file
+    generation: integer
+        the number of compactions so far (0 for version 1 files)
+    headerSize: integer
+        the size of the header in bytes, the index starts right after it
+    '''
+    header = HEADERS[HEADERS[1].unpack_from(mappedFile, 0)[1]]
+    fields = header.unpack_from(mappedFile, 0)
+    generation = fields[3] if len(fields) > 3 else 0
+    return fields[2], generation, header.size
+
+
+def iterBinaryRecords(mappedFile):
+    '''
+    This function decodes the shapes in a mapped binary save file one at a time. The vertexes
+    are not copied, they are views into the mapped file.
+
+    Parameters
+    ----------
+    mappedFile: mmap
+        the mapped file from openBinary
+
+    Returns
+    -------
+    generator
+        yields ('reg', numOfSide, side) for a regular shape and ('irreg', coords, crossSum, edgeSum) for
+        an irregular shape, where coords is a read-only memoryview of world coordinates x0, y0, x1, y1, ...
+        Raises ValueError when it reaches a shape whose vertexes are outside of the file
+    '''
+    numOfShape, generation, headerSize = readHeader(mappedFile)
+    indexEnd = headerSize + INDEX_ENTRY.size*numOfShape # the vertexes start here
+    data = memoryview(mappedFile)
+    for i in range(numOfShape):
+        kind, count, side, offset, crossSum, edgeSum = INDEX_ENTRY.unpack_from(mappedFile, headerSize + INDEX_ENTRY.size*i)
+        if kind == REG_KIND:
+            yield ('reg', count, side)
+        elif kind == IRREG_KIND:
+            if offset < indexEnd or offset + count*16 > len(data):
+                raise ValueError(f'the vertexes of shape {i} are outside of the save file')
+            coords = data[offset:offset + count*16].cast('d')
+            if sys.byteorder != 'little': # the views can only be used as they are on little-endian machines
+                coords = array('d', coords)
+                coords.byteswap()
+            yield ('irreg', coords, crossSum, edgeSum)
+
+
+def readJournal(generation, fileName=JOURNAL_FILE):
+    '''
+    This function reads the shapes and clears saved in the journal since the binary save file was written.
+    A record cut off by a crash while it was being appended is ignored.
+
+    Parameters
+    ----------
+    generation: integer
+        the generation of the binary save file, a journal of an older generation is already compacted
+    fileName: String
+        the name of the journal
+
+    Returns
+    -------
+    records: list
+        ('reg', numOfSide, side), ('irreg', coords, crossSum, edgeSum) or ('clear',) in the order they happened
+    validLength: integer
+        the number of bytes of the journal that can be kept, 0 if the journal has to be started again
+    '''
+    if not os.path.exists(fileName):
+        return [], 0
+    with open(fileName, 'rb') as file:
+        data = file.read()
+    if len(data) < JOURNAL_HEADER.size:
+        return [], 0
+    magic, version, journalGeneration = JOURNAL_HEADER.unpack_from(data, 0)
+    if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION or journalGeneration != generation:
+        return [], 0
+    records = []
+    pos = JOURNAL_HEADER.size
+    while pos + JOURNAL_ENTRY.size <= len(data):
+        kind, count, side, crossSum, edgeSum = JOURNAL_ENTRY.unpack_from(data, pos)
+        end = pos + JOURNAL_ENTRY.size
+        if kind == IRREG_KIND:
+            end += count*16
+        if end > len(data) or kind not in (REG_KIND, IRREG_KIND, CLEAR_KIND):
+            break # the rest of the journal is cut off
+        if kind == REG_KIND:
+            records.append(('reg', count, side))
+        elif kind == IRREG_KIND:
+            coords = array('d')
+            coords.frombytes(data[pos + JOURNAL_ENTRY.size:end])
+            if sys.byteorder != 'little':
+                coords.byteswap()
+            records.append(('irreg', coords, crossSum, edgeSum))
+        else:
+            records.append(('clear',))
+        pos = end
+    return records, pos
+
+
+class ShapeJournal:
+    """
+    A class used to represent the journal that every finished shape and every clear is appended to
+    
+    """
+    def __init__(self, generation, validLength=0, fileName=JOURNAL_FILE):
+        '''
+        This function opens the journal for appending
+
+        Parameters
+        ----------
+        generation: integer
+            the generation of the binary save file the journal continues
+        validLength: integer
+            the number of bytes of the existing journal to keep (from readJournal), 0 to start a new journal
+        fileName: String
+            the name of the journal
+
+        Returns
+        -------
+        None
+        '''
+        self.fileName = fileName
+        self.file = None
+        if validLength > 0:
+            os.truncate(fileName, validLength) # drop a record cut off by a crash
+            self.file = open(fileName, 'ab')
+        else:
+            self.reset(generation)
+            
+    def reset(self, generation):
+        '''
+        This function starts a new empty journal after the shapes are compacted into a binary save file
+
+        Parameters
+        ----------
+        generation: integer
+            the generation of the new binary save file
+
+        Returns
+        -------
+        None
+        '''
+        if self.file != None:
+            self.file.close()
+        tmpName = self.fileName + '.tmp'
+        with open(tmpName, 'wb') as file:
+            file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, generation))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmpName, self.fileName)
+        self.file = open(self.fileName, 'ab')
+        
+    def getSize(self):
+        '''
+        This function gets the size of the journal
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        integer
+            the size of the journal in bytes
+        '''
+        return self.file.tell()
+        
+    def append(self, kind, count=0, side=0.0, crossSum=0.0, edgeSum=0.0, coords=None):
+        '''
+        This function appends one record to the journal and makes sure it reaches the disk
+
+        Parameters
+        ----------
+        kind: integer
+            REG_KIND, IRREG_KIND or CLEAR_KIND
+        count: integer
+            the number of sides of a regular shape or the number of points of an irregular shape
+        side: float
+            the side length of a regular shape
+        crossSum: float
+            the shoelace sum of an irregular shape
+        edgeSum: float
+            the side length sum of an irregular shape
+        coords: buffer
+            the points of an irregular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.file.write(JOURNAL_ENTRY.pack(kind, count, side, crossSum, edgeSum))
+        if coords != None:
+            if sys.byteorder != 'little': # the journal is always little-endian
+                coords = array('d', coords)
+                coords.byteswap()
+            self.file.write(coords)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        
+    def addReg(self, shape):
+        '''
+        This function appends a finished regular shape to the journal
+
+        Parameters
+        ----------
+        shape: RegPolygon
+            the finished regular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.append(REG_KIND, shape.numOfSide, shape.side)
+        
+    def addIrreg(self, shape):
+        '''
+        This function appends a finished irregular shape to the journal
+
+        Parameters
+        ----------
+        shape: IrregPolygon
+            the finished irregular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.append(IRREG_KIND, len(shape.coords)//2, 0.0, shape.crossSum, shape.edgeSum, shape.coords)
+        
+    def addClear(self):
+        '''
+        This function appends a clear to the journal, every shape before it is removed
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.append(CLEAR_KIND)
+        
+    def close(self):
+        '''
+        This function closes the journal
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.file.close()
+
+
+class FileStore:
+    """
+    A class used to represent the shapes stored in the binary save file and its journal
+    
+    """
+    def __init__(self, binaryName=BINARY_FILE, journalName=JOURNAL_FILE, textName=TEXT_FILE):
+        '''
+        This function initializes the names of the save files
+
+        Parameters
+        ----------
+        binaryName: String
+            the name of the binary save file
+        journalName: String
+            the name of the journal
+        textName: String
+            the name of the older text save file, only read if there is no binary save file
+
+        Returns
+        -------
+        None
+        '''
+        self.binaryName = binaryName
+        self.journalName = journalName
+        self.textName = textName
+        
+        self.mappedFile = None # the mapped binary save file
+        self.generation = 0 # the generation of the binary save file
+        self.snapshotSize = 0 # the size of the binary save file
+        self.journal = None
+        
+    def load(self):
+        '''
+        This function opens the save files and replays the shapes and clears saved in the journal
+        after the binary save file was written
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        iterable
+            the stored shapes, see iterBinaryRecords
+        '''
+        if os.path.exists(self.binaryName):
+            # map the binary save file, the points of the shapes are used without copying them
+            self.mappedFile = openBinary(self.binaryName)
+            self.generation = readHeader(self.mappedFile)[1]
+            self.snapshotSize = self.mappedFile.size()
+            records = iterBinaryRecords(self.mappedFile)
+        elif os.path.exists(self.textName):
+            records = iterTextRecords(self.textName)
+        else:
+            records = []
+        journalRecords, validLength = readJournal(self.generation, self.journalName)
+        self.journal = ShapeJournal(self.generation, validLength, self.journalName)
+        clearAt = None
+        for i in range(len(journalRecords)):
+            if journalRecords[i][0] == 'clear':
+                clearAt = i
+        if clearAt != None: # only the shapes after the last clear are kept
+            return journalRecords[clearAt+1:]
+        return chain(records, journalRecords)
+        
+    def addReg(self, shape):
+        '''
+        This function saves a finished regular shape
+
+        Parameters
+        ----------
+        shape: RegPolygon
+            the finished regular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.journal.addReg(shape)
+        
+    def addIrreg(self, shape):
+        '''
+        This function saves a finished irregular shape
+
+        Parameters
+        ----------
+        shape: IrregPolygon
+            the finished irregular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.journal.addIrreg(shape)
+        
+    def addClear(self):
+        '''
+        This function saves a clear, every shape saved before it is removed
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.journal.addClear()
+        
+    def needsCompaction(self):
+        '''
+        This function detects if the journal is larger than the binary save file, so compacting it
+        keeps the cost of saving proportional to the changed data
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Boolean
+            whether the journal should be compacted
+        '''
+        return self.journal.getSize() > max(COMPACT_SIZE, self.snapshotSize)
+        
+    def compact(self, regShapes, irregShapes):
+        '''
+        This function writes all shapes into a new binary save file and starts a new empty journal
+
+        Parameters
+        ----------
+        regShapes: list
+            every finished regular shape (RegPolygon)
+        irregShapes: list
+            every finished irregular shape (IrregPolygon)
+
+        Returns
+        -------
+        None
+        '''
+        if self.mappedFile != None:
+            # copy the loaded points out of the mapped save file, so the file can be closed and replaced
+            for shape in irregShapes:
+                if isinstance(shape.coords, memoryview):
+                    shape.coords = array('d', shape.coords)
+            self.mappedFile.close()
+            self.mappedFile = None
+        # the new file gets the next generation, so the old journal is never replayed on top of it,
+        # even if the program stops before the new journal is started
+        self.snapshotSize = writeBinary(regShapes, irregShapes, self.generation + 1, self.binaryName)
+        self.generation += 1
+        self.journal.reset(self.generation)
+        
+    def close(self):
+        '''
+        This function closes the journal, the mapped file stays open while the shapes use its points
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        if self.journal != None:
+            self.journal.close()
+
+
+class SqliteStore:
+    """
+    A class used to represent the shapes stored in an SQLite database, with indexed columns to
+    load only the shapes that are needed
+    
+    """
+    def __init__(self, fileName=DATABASE_FILE):
+        '''
+        This function opens the database and creates its table and indexes
+
+        Parameters
+        ----------
+        fileName: String
+            the name of the database file
+
+        Returns
+        -------
+        None
+        '''
+        import sqlite3 # only needed when this store is used
+        self.connection = sqlite3.connect(fileName)
+        with self.connection:
+            self.connection.execute('''CREATE TABLE IF NOT EXISTS shapes (
+                id INTEGER PRIMARY KEY, kind INTEGER NOT NULL, numOfSide INTEGER NOT NULL, side REAL,
+                area REAL NOT NULL, perimeter REAL NOT NULL, crossSum REAL, edgeSum REAL,
+                minX REAL NOT NULL, minY REAL NOT NULL, maxX REAL NOT NULL, maxY REAL NOT NULL, coords BLOB)''')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS shapesNumOfSide ON shapes (numOfSide)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS shapesArea ON shapes (area)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS shapesPerimeter ON shapes (perimeter)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS shapesBounds ON shapes (minX, maxX, minY, maxY)')
+            
+    def load(self, numOfSide=None, minArea=None, maxArea=None, minPerimeter=None, maxPerimeter=None, viewport=None):
+        '''
+        This function loads the stored shapes that match every given condition, in the order they were saved
+
+        Parameters
+        ----------
+        numOfSide: integer
+            only load shapes with this number of sides
+        minArea, maxArea: float
+            only load shapes with an area in this range
+        minPerimeter, maxPerimeter: float
+            only load shapes with a perimeter in this range
+        viewport: tuple
+            (minX, minY, maxX, maxY) in world units, only load shapes whose bounding box overlaps it
+
+        Returns
+        -------
+        generator
+            the stored shapes, see iterBinaryRecords (the points are copied out of the database)
+        '''
+        # shapes saved while loading are already in the program, so they are not loaded again
+        lastId = self.connection.execute('SELECT MAX(id) FROM shapes').fetchone()[0] or 0
+        conditions = ['id <= ?']
+        values = [lastId]
+        for column, operator, value in (('numOfSide', '=', numOfSide), ('area', '>=', minArea), ('area', '<=', maxArea),
+                                        ('perimeter', '>=', minPerimeter), ('perimeter', '<=', maxPerimeter)):
+            if value != None:
+                conditions.append(f'{column} {operator} ?')
+                values.append(value)
+        if viewport != None:
+            conditions.append('maxX >= ? AND minX <= ? AND maxY >= ? AND minY <= ?')
+            values += (viewport[0], viewport[2], viewport[1], viewport[3])
+        query = 'SELECT kind, numOfSide, side, crossSum, edgeSum, coords FROM shapes WHERE ' + ' AND '.join(conditions) + ' ORDER BY id'
+        for kind, count, side, crossSum, edgeSum, blob in self.connection.execute(query, values):
+            if kind == REG_KIND:
+                yield ('reg', count, side)
+            else:
+                coords = array('d')
+                coords.frombytes(blob)
+                if sys.byteorder != 'little':
+                    coords.byteswap()
+                yield ('irreg', coords, crossSum, edgeSum)
+                
+    def insert(self, regShapes, irregShapes):
+        '''
+        This function inserts shapes with their number of sides, area, perimeter and bounding box
+
+        Parameters
+        ----------
+        regShapes: list
+            the regular shapes (RegPolygon) to insert
+        irregShapes: list
+            the irregular shapes (IrregPolygon) to insert
+
+        Returns
+        -------
+        None
+        '''
+        rows = self.getRows(regShapes, irregShapes)
+        with self.connection: # one transaction
+            self.insertRows(rows)
+            
+    def getRows(self, regShapes, irregShapes):
+        '''
+        This function gets the rows of the table for shapes
+
+        Parameters
+        ----------
+        regShapes: list
+            the regular shapes (RegPolygon)
+        irregShapes: list
+            the irregular shapes (IrregPolygon)
+
+        Returns
+        -------
+        list
+            the rows, with the columns in the order insertRows expects
+        '''
+        rows = []
+        for shape in regShapes:
+            area, perimeter = shapeMetrics(shape.getVertices())
+            rows.append((REG_KIND, shape.numOfSide, shape.side, area, perimeter, None, None) + shape.getBounds() + (None,))
+        for shape in irregShapes:
+            coords = array('d', shape.coords)
+            if sys.byteorder != 'little': # the blobs are always little-endian
+                coords.byteswap()
+            rows.append((IRREG_KIND, len(coords)//2 - 1, None, abs(shape.crossSum)/2, shape.edgeSum, shape.crossSum, shape.edgeSum)
+                        + shape.getBounds() + (coords.tobytes(),))
+        return rows
+        
+    def insertRows(self, rows):
+        '''
+        This function inserts rows into the table, inside the transaction of the caller
+
+        Parameters
+        ----------
+        rows: list
+            the rows from getRows
+
+        Returns
+        -------
+        None
+        '''
+        self.connection.executemany('''INSERT INTO shapes (kind, numOfSide, side, area, perimeter, crossSum, edgeSum,
+            minX, minY, maxX, maxY, coords) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+            
+    def addReg(self, shape):
+        '''
+        This function saves a finished regular shape
+
+        Parameters
+        ----------
+        shape: RegPolygon
+            the finished regular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.insert([shape], [])
+        
+    def addIrreg(self, shape):
+        '''
+        This function saves a finished irregular shape
+
+        Parameters
+        ----------
+        shape: IrregPolygon
+            the finished irregular shape
+
+        Returns
+        -------
+        None
+        '''
+        self.insert([], [shape])
+        
+    def addClear(self):
+        '''
+        This function removes every saved shape
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        with self.connection:
+            self.connection.execute('DELETE FROM shapes')
+            
+    def needsCompaction(self):
+        '''
+        This function detects if the store should be compacted, the database never needs it
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        Boolean
+            always False
+        '''
+        return False
+        
+    def compact(self, regShapes, irregShapes):
+        '''
+        This function replaces every saved shape with the given shapes in one transaction
+
+        Parameters
+        ----------
+        regShapes: list
+            every finished regular shape (RegPolygon)
+        irregShapes: list
+            every finished irregular shape (IrregPolygon)
+
+        Returns
+        -------
+        None
+        '''
+        rows = self.getRows(regShapes, irregShapes)
+        with self.connection: # if anything fails, the saved shapes are kept
+            self.connection.execute('DELETE FROM shapes')
+            self.insertRows(rows)
+        
+    def close(self):
+        '''
+        This function closes the database
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        '''
+        self.connection.close()
+
+
+def iterChunks(records, chunkSize=CHUNK_SIZE):
+    '''
+    This function groups the decoded shapes into lists of a fixed size
+
+    Parameters
+    ----------
+    records: iterable
+        the decoded shapes, see iterTextRecords
+    chunkSize: integer
+        the number of shapes in each list
+
+    Returns
+    -------
+    generator
+        yields lists of at most chunkSize shapes
+    '''
+    records = iter(records)
+    chunk = list(islice(records, chunkSize))
+    while chunk:
+        yield chunk
+        chunk = list(islice(records, chunkSize))